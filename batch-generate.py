@@ -0,0 +1,55 @@
+"""
+Runs `cfn generate` for many resource project directories in a single process, so that the CloudFormation CLI and
+its language plugin are started and imported once instead of once per resource type. Must be run with the Python
+interpreter the CloudFormation CLI is installed in.
+
+Prints one JSON line per directory with the time it took and the error, if any.
+
+Usage: python3 batch-generate.py <directory> [<directory> ...]
+"""
+import contextlib
+import json
+import os
+import sys
+import time
+
+from rpdk.core.cli import main as cfn_main
+
+
+def generate_directory(directory):
+    """
+    Runs `cfn generate` in a resource project directory.
+
+    Args:
+        directory (str): The project directory.
+
+    Returns:
+        dict: The directory, the time taken in seconds and the error message if the generation failed, otherwise None.
+    """
+    cwd = os.getcwd()
+    start = time.perf_counter()
+    error = None
+
+    try:
+        os.chdir(directory)
+        # the CLI logs to stdout, which carries the results
+        with contextlib.redirect_stdout(sys.stderr):
+            cfn_main(["generate"])
+    except SystemExit as e:
+        if e.code:
+            error = "cfn generate exited with status {}".format(e.code)
+    except Exception as e:
+        error = str(e)
+    finally:
+        os.chdir(cwd)
+
+    return {
+        'directory': directory,
+        'seconds': time.perf_counter() - start,
+        'error': error
+    }
+
+
+if __name__ == "__main__":
+    for directory in sys.argv[1:]:
+        print(json.dumps(generate_directory(directory)), flush=True)
@@ -0,0 +1,183 @@
+"""
+Simulates CREATE operations of a generated resource type against an in-memory S3 (moto) and a stand-in executor that
+completes each operation after a given duration, and reports how many progress polls and status lookups every
+operation costs and how late its completion is noticed. Time is simulated, so the run takes seconds.
+
+Must be run with the Python interpreter the CloudFormation CLI is installed in, with moto installed into it.
+
+Usage: python3 benchmark-polls.py <resource directory> [--durations 5,30,120,600]
+"""
+import argparse
+import dataclasses
+import importlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+ACCOUNT_ID = "123456789012"
+REGION = "us-east-1"
+
+
+class SimulatedClock:
+    """
+    Stands in for the time module of the handler runtime.
+    """
+
+    def __init__(self):
+        self.now = 1000000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class SimulatedExecutor:
+    """
+    Stands in for the executor Lambda function: records every invocation and writes the state and status objects of
+    an operation once its duration has passed.
+
+    Args:
+        s3client: The S3 client used to write the objects.
+        bucket (str): The state bucket.
+        clock (SimulatedClock): The simulated clock.
+        duration (float): The time an operation takes in seconds.
+    """
+
+    class exceptions:
+        class ResourceNotFoundException(Exception):
+            pass
+
+    def __init__(self, s3client, bucket, clock, duration):
+        self.s3client = s3client
+        self.bucket = bucket
+        self.clock = clock
+        self.duration = duration
+        self.pending = []
+        self.completed = {}
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        self.pending.append((self.clock.time() + self.duration, json.loads(Payload)))
+        return {'StatusCode': 202}
+
+    def complete_due(self):
+        for due, payload in [entry for entry in self.pending if entry[0] <= self.clock.time()]:
+            self.pending.remove((due, payload))
+            self.s3client.put_object(Bucket=self.bucket, Key="state/{}/{}.model.json".format(payload['terraformTypeName'], payload['trackingId']), Body=b'{}')
+            self.s3client.put_object(Bucket=self.bucket, Key="status/{}.json".format(payload['operationId']), Body=json.dumps({'status': 'completed'}).encode())
+            self.completed[payload['operationId']] = due
+
+
+class SimulatedSession:
+    """
+    Stands in for the SessionProxy passed to the handlers, routing the Lambda client to the simulated executor.
+    """
+
+    def __init__(self, executor):
+        self.session = boto3.Session(aws_access_key_id="testing", aws_secret_access_key="testing", region_name=REGION)
+        self.executor = executor
+
+    def client(self, service):
+        return self.executor if service == "lambda" else self.session.client(service)
+
+
+def load_handlers(resource_dir):
+    """
+    Imports the generated handlers of a resource project.
+
+    Args:
+        resource_dir (Path): The resource project directory (eg. resources/aviatrix/TF-Aviatrix-Account).
+
+    Returns:
+        module: The handlers module.
+    """
+    package_dir = next(path.parent for path in (resource_dir / "src").glob("*/handlers.py"))
+    sys.path.insert(0, str(package_dir.parent))
+    return importlib.import_module(package_dir.name + ".handlers")
+
+
+def make_request(handlers, model, nextToken=None):
+    """
+    Builds a handler request with only the fields the handlers use.
+    """
+    values = {field.name: None for field in dataclasses.fields(handlers.ResourceHandlerRequest)}
+    values.update(clientRequestToken="benchmark", desiredResourceState=model, logicalResourceIdentifier="Resource", awsAccountId=ACCOUNT_ID, nextToken=nextToken)
+    return handlers.ResourceHandlerRequest(**values)
+
+
+def simulate_create(handlers, runtime, duration):
+    """
+    Runs a CREATE operation to completion on simulated time.
+
+    Args:
+        handlers (module): The handlers module.
+        runtime (module): The handler runtime module.
+        duration (float): The time the operation takes in the executor, in seconds.
+
+    Returns:
+        dict: The number of polls and status lookups and the delay between completion and its detection.
+    """
+    clock = SimulatedClock()
+    runtime.time = clock
+    runtime.client_cache.clear()
+
+    bucket = "cfntf-{}-{}".format(REGION, ACCOUNT_ID)
+    s3client = boto3.client("s3", region_name=REGION)
+    s3client.create_bucket(Bucket=bucket)
+
+    status_gets = []
+    executor = SimulatedExecutor(s3client, bucket, clock, duration)
+    session = SimulatedSession(executor)
+    runtime.get_client(session, "s3").meta.events.register("before-call.s3.GetObject",
+        lambda params, **kwargs: status_gets.append(1) if "/status/" in params['url_path'] else None)
+
+    # CREATE replaces the identifier with its tracking id
+    progress = handlers.create_handler(session, make_request(handlers, handlers.ResourceModel._deserialize({'tfcfnid': "new"})), {})
+    polls = 0
+    while progress.status.name == "IN_PROGRESS":
+        clock.sleep(progress.callbackDelaySeconds)
+        executor.complete_due()
+        progress = handlers.create_handler(session, make_request(handlers, handlers.ResourceModel._deserialize({'tfcfnid': "new"})), progress.callbackContext)
+        polls += 1
+
+    if progress.status.name != "SUCCESS":
+        raise RuntimeError("The operation failed: {}".format(progress.message))
+
+    completed = next(iter(executor.completed.values()))
+    return {
+        'polls': polls,
+        'status_gets': len(status_gets),
+        'detection_delay': clock.time() - completed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the progress polls per operation of generated handlers on simulated time.")
+    parser.add_argument("resource_dir", help="the generated resource project, eg. resources/aviatrix/TF-Aviatrix-Account")
+    parser.add_argument("--durations", default="5,15,30,60,120,300,600,1200", help="comma-separated operation durations in seconds")
+    args = parser.parse_args()
+
+    os.environ.update(AWS_REGION=REGION, AWS_DEFAULT_REGION=REGION, AWS_ACCESS_KEY_ID="testing", AWS_SECRET_ACCESS_KEY="testing")
+
+    # the handlers only log progress messages
+    logging.disable(logging.WARNING)
+
+    with mock_aws():
+        handlers = load_handlers(Path(args.resource_dir))
+        runtime = sys.modules[handlers.__package__ + ".handlers_runtime"]
+
+        print("expected duration of {}: {} s".format(handlers.TYPE_NAME, handlers.resource_type.expected_duration))
+        print("  {:>10} {:>7} {:>12} {:>16}".format("duration", "polls", "status GETs", "detection delay"))
+        for duration in [float(d) for d in args.durations.split(",")]:
+            result = simulate_create(handlers, runtime, duration)
+            print("  {:8.0f} s {:7} {:12} {:14.0f} s".format(duration, result['polls'], result['status_gets'], result['detection_delay']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Micro-benchmarks for generate.py. exec_call is stubbed out, so no terraform, git or cfn process is started and
+only the in-process work of the generator is measured.
+
+With --suite, runs the phases of a provider generation (type conversion, block expansion, overrides and doc parsing)
+against synthetic provider schemas of several sizes and reports the time and peak memory of every phase.
+
+With --handler-imports, measures the cold-start import time of already generated resource handlers instead.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import generate
+
+# resource count, attribute count, block count and nesting depth of the synthetic provider schemas of --suite
+SUITE_SCENARIOS = [
+    (100, 20, 2, 1),
+    (20, 200, 10, 1),
+    (20, 20, 3, 3)
+]
+
+
+def stub_exec_call(args, cwd):
+    """
+    Stands in for generate.exec_call, creating the package directory that cfn init/generate would create.
+
+    Args:
+        args (list): The command-line arguments that would have been executed.
+        cwd (str): The directory the command would have been executed in.
+
+    Returns:
+        bytes: An empty output.
+    """
+    if args[:1] == ['cfn']:
+        (Path(cwd) / "src" / Path(cwd).name.lower().replace("-", "_")).mkdir(parents=True, exist_ok=True)
+    return b''
+
+
+def synthetic_attribute_type(index, depth):
+    """
+    Builds the Terraform type of a synthetic attribute. Most attributes are primitives or collections of primitives,
+    every fifth one is a list of objects nested to the given depth.
+
+    Args:
+        index (int): The position of the attribute.
+        depth (int): The nesting depth of the object types.
+
+    Returns:
+        str or list: The attribute type.
+    """
+    if depth > 1 and index % 5 == 4:
+        return ["list", ["object", {"field_{}".format(i): synthetic_attribute_type(i, depth - 1) for i in range(5)}]]
+
+    return ["string", "number", "bool", ["list", "string"], ["map", "string"]][index % 5] if depth > 1 else "string"
+
+
+def synthetic_block_names(block_count, depth, prefix="block"):
+    """
+    Lists the names of the nested blocks of a synthetic resource with their parent block, top-level blocks first.
+
+    Args:
+        block_count (int): The number of blocks at the top level and in each block.
+        depth (int): The nesting depth of the blocks.
+        prefix (str): The name of the parent block, or "block" at the top level.
+
+    Returns:
+        list: The block names and the names of their parent blocks (None at the top level).
+    """
+    names = [("{}_{}".format(prefix, b), None if prefix == "block" else prefix) for b in range(block_count)]
+    if depth > 1:
+        for name, _ in list(names):
+            names += synthetic_block_names(block_count, depth - 1, name)
+    return names
+
+
+def synthetic_resource(attribute_count, block_count, depth=1):
+    """
+    Builds a Terraform resource schema block with the given number of top-level attributes and nested blocks.
+
+    Args:
+        attribute_count (int): The number of attributes at the top level and in each block.
+        block_count (int): The number of blocks at the top level and in each block.
+        depth (int): The nesting depth of the blocks and the object attribute types.
+
+    Returns:
+        dict: The resource schema.
+    """
+    def attributes(prefix):
+        return {"{}_attribute_{}".format(prefix, i): {'type': synthetic_attribute_type(i, depth), 'optional': True} for i in range(attribute_count)}
+
+    def blocks(prefix, level):
+        block_types = {}
+        for b in range(block_count):
+            name = "{}_{}".format(prefix, b)
+            block = {'attributes': attributes(name)}
+            if level < depth:
+                block['block_types'] = blocks(name, level + 1)
+            # nested schemas mix the nesting modes
+            block_types[name] = {'nesting_mode': ['list', 'set', 'single'][b % 3] if depth > 1 else 'list', 'block': block}
+        return block_types
+
+    return {
+        'block': {
+            'attributes': attributes("top"),
+            'block_types': blocks("block", 1)
+        }
+    }
+
+
+def synthetic_docs(tf_type, attribute_count, block_count, depth=1):
+    """
+    Builds the Markdown documentation of a resource created by synthetic_resource.
+
+    Args:
+        tf_type (str): The Terraform resource type name.
+        attribute_count (int): The number of attributes at the top level and in each block.
+        block_count (int): The number of blocks at the top level and in each block.
+        depth (int): The nesting depth of the blocks.
+
+    Returns:
+        str: The Markdown documentation.
+    """
+    block_names = synthetic_block_names(block_count, depth)
+
+    lines = ["# " + tf_type, "", "The **{}** resource is synthetic.".format(tf_type), "", "## Argument Reference", ""]
+    for i in range(attribute_count):
+        lines.append("* `top_attribute_{}` - (Optional) Top-level attribute {}.".format(i, i))
+    for name, parent in block_names:
+        if parent is None:
+            lines.append("* `{}` - (Optional) Block {}.".format(name, name))
+    for block, _ in block_names:
+        lines += ["", "The `{}` block supports:".format(block), ""]
+        for i in range(attribute_count):
+            lines.append("* `{}_attribute_{}` - (Optional) Attribute {} of block {}.".format(block, i, i, block))
+        for name, parent in block_names:
+            if parent == block:
+                lines.append("* `{}` - (Optional) Block {}.".format(name, name))
+    lines += ["", "## Attributes Reference", "", "* `id` - The ID of the resource.", ""]
+
+    return "\n".join(lines)
+
+
+def check_generated(result):
+    """
+    Fails the benchmark if generate_resource reported an error, rather than timing the error path.
+
+    Args:
+        result (tuple): The result of generate_resource.
+    """
+    cfntypename, error = result
+    if error:
+        raise RuntimeError("Failed to generate {}:\n{}".format(cfntypename, error))
+
+
+def time_call(fn, repeat):
+    """
+    Returns the best wall-clock time of a call over several repetitions.
+
+    Args:
+        fn (callable): The function to time.
+        repeat (int): The number of repetitions.
+
+    Returns:
+        float: The fastest time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def measure(fn, repeat):
+    """
+    Measures the best wall-clock time of a call over several repetitions, and its peak memory allocation in one more
+    traced call (tracing slows the call down, so it is not timed).
+
+    Args:
+        fn (callable): The function to measure.
+        repeat (int): The number of timed repetitions.
+
+    Returns:
+        tuple: The fastest time in seconds and the peak traced memory in bytes.
+    """
+    elapsed = time_call(fn, repeat)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def schema_attributes(block):
+    """
+    Lists the attributes of a Terraform schema block and all of its nested blocks.
+
+    Args:
+        block (dict): The schema block.
+
+    Returns:
+        list: The attribute names and their definitions.
+    """
+    attributes = list(block.get('attributes', {}).items())
+    for nested in block.get('block_types', {}).values():
+        attributes += schema_attributes(nested['block'])
+    return attributes
+
+
+def bench_suite(scenarios, repeat):
+    """
+    Runs the phases of a provider generation against synthetic provider schemas and documentation, and reports the
+    time and peak memory of every phase.
+
+    Args:
+        scenarios (list): The resource count, attribute count, block count and nesting depth of every synthetic provider.
+        repeat (int): The number of repetitions, the best time is reported.
+    """
+    provider_data = {'data': [{'attributes': {'full-name': 'AviatrixSystems/aviatrix'}}]}
+
+    for resource_count, attribute_count, block_count, depth in scenarios:
+        resources = {"aviatrix_synthetic_{}".format(r): synthetic_resource(attribute_count, block_count, depth) for r in range(resource_count)}
+        docs = {tf_type: synthetic_docs(tf_type, attribute_count, block_count, depth) for tf_type in resources}
+        doc_resources = {}
+        schemas = []
+
+        def parse_docs():
+            for tf_type, doc in docs.items():
+                doc_resources[tf_type] = generate.process_resource_docs("aviatrix", doc, [], provider_data)
+
+        def convert_types():
+            for tf_schema in resources.values():
+                definitions = {}
+                registry = generate.DefinitionRegistry(definitions)
+                for attrname, attr in schema_attributes(tf_schema['block']):
+                    generate.jsonschema_type(attr['type'], definitions, generate.tf_to_cfn_str(attrname), registry)
+
+        def generate_resources():
+            for tf_type, tf_schema in resources.items():
+                check_generated(generate.generate_resource((tf_type, tf_schema, "aviatrix", provider_data, doc_resources[tf_type], False, 0, False)))
+
+        def generate_overrides():
+            for schema in schemas:
+                for prop in schema['properties'].values():
+                    if prop.get('type') == "array" and '$ref' in prop['items']:
+                        generate.generate_empty_override(schema, prop['items'])
+
+        phases = [("process_resource_docs", parse_docs), ("jsonschema_type", convert_types), ("generate_resource", generate_resources)]
+        results = [(name, measure(fn, repeat)) for name, fn in phases]
+
+        # the overrides are generated from the schemas written by generate_resource
+        for tf_type in resources:
+            _, cfndirname = generate.cfn_type_names(tf_type, "aviatrix")
+            with open(Path("resources") / "aviatrix" / cfndirname / (cfndirname.lower() + ".json"), "r") as f:
+                schemas.append(json.load(f))
+        results.append(("generate_empty_override", measure(generate_overrides, repeat)))
+
+        print("suite: {} resources x {} attributes x {} blocks, depth {} ({} attributes per resource)".format(resource_count, attribute_count,
+            block_count, depth, len(schema_attributes(next(iter(resources.values()))['block']))))
+        print("  {:24} {:>12} {:>13}".format("phase", "time", "peak memory"))
+        for name, (elapsed, peak) in results:
+            print("  {:24} {:9.2f} ms {:9.2f} MiB".format(name, elapsed * 1000, peak / 1048576))
+
+
+def bench_doc_merge(attribute_count, block_count, repeat):
+    """
+    Measures how much of the generation time of a single resource is spent merging its documentation, by generating
+    it with and without its parsed doc entry.
+
+    Args:
+        attribute_count (int): The number of attributes at the top level and in each block.
+        block_count (int): The number of nested blocks.
+        repeat (int): The number of repetitions.
+    """
+    tf_type = "aviatrix_synthetic"
+    provider_data = {'data': [{'attributes': {'full-name': 'AviatrixSystems/aviatrix'}}]}
+    tf_schema = synthetic_resource(attribute_count, block_count)
+    doc_resource = generate.process_resource_docs("aviatrix", synthetic_docs(tf_type, attribute_count, block_count), [], provider_data)
+
+    without_docs = time_call(lambda: check_generated(generate.generate_resource((tf_type, tf_schema, "aviatrix", provider_data, None, False, 0, False))), repeat)
+    with_docs = time_call(lambda: check_generated(generate.generate_resource((tf_type, tf_schema, "aviatrix", provider_data, doc_resource, False, 0, False))), repeat)
+    doc_merge = max(with_docs - without_docs, 0)
+
+    print("doc merge: {} attributes x {} blocks ({} documented arguments)".format(attribute_count, block_count, len(doc_resource['arguments'])))
+    print("  generate without docs  {:9.2f} ms".format(without_docs * 1000))
+    print("  generate with docs     {:9.2f} ms".format(with_docs * 1000))
+    print("  doc merge              {:9.2f} ms ({:.1f}% of the resource)".format(doc_merge * 1000, doc_merge / with_docs * 100))
+
+
+def import_times(package_dir):
+    """
+    Imports the handlers of a generated resource package in a fresh interpreter and reads the cumulative import time
+    of its parts from `python -X importtime`. Bytecode caching is disabled, as the packages are deployed without it.
+
+    Args:
+        package_dir (Path): The handler package directory (src/<package>).
+
+    Returns:
+        dict: The cumulative import time in seconds of the handlers module and the modules it imports, by module name.
+    """
+    module = package_dir.name + ".handlers"
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(generate.cfn_python() + ["-X", "importtime", "-c", "import " + module],
+        cwd=package_dir.parent, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+
+    times = {}
+    for line in result.stderr.decode("utf-8").splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000000
+
+    return {
+        'total': times.get(module, 0),
+        'cloudformation_cli_python_lib': times.get('cloudformation_cli_python_lib', 0),
+        'models': times.get(package_dir.name + ".models", 0),
+        'handlers_runtime': times.get(package_dir.name + ".handlers_runtime", 0)
+    }
+
+
+def bench_handler_imports(resources_dir, repeat):
+    """
+    Measures the import time of the handlers of every generated resource type under a provider directory.
+
+    Args:
+        resources_dir (Path): The provider directory, eg. resources/aviatrix.
+        repeat (int): The number of repetitions, the best time of each part is reported.
+    """
+    package_dirs = sorted(path.parent for path in resources_dir.glob("*/src/*/handlers.py") if (path.parent / "models.py").exists())
+    if not package_dirs:
+        print("No generated handlers found in {}".format(resources_dir))
+        return
+
+    print("handler imports: {} resource types".format(len(package_dirs)))
+    print("  {:50} {:>9} {:>9} {:>9} {:>9}".format("package", "total", "cfn lib", "models", "runtime"))
+    totals = []
+    for package_dir in package_dirs:
+        runs = [import_times(package_dir) for _ in range(repeat)]
+        best = {k: min(run[k] for run in runs) for k in runs[0]}
+        totals.append(best['total'])
+        print("  {:50} {:6.1f} ms {:6.1f} ms {:6.1f} ms {:6.1f} ms".format(package_dir.name, best['total'] * 1000,
+            best['cloudformation_cli_python_lib'] * 1000, best['models'] * 1000, best['handlers_runtime'] * 1000))
+
+    totals.sort()
+    print("  median {:.1f} ms, max {:.1f} ms".format(totals[len(totals) // 2] * 1000, totals[-1] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs micro-benchmarks of the schema generator.")
+    parser.add_argument("--attributes", type=int, default=200, help="the number of attributes at the top level and per block (default: 200)")
+    parser.add_argument("--blocks", type=int, default=10, help="the number of nested blocks (default: 10)")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of repetitions, the best time is reported (default: 5)")
+    parser.add_argument("--suite", action="store_true", help="measure the time and peak memory of the generation phases against synthetic provider schemas instead")
+    parser.add_argument("--scenarios", help="comma-separated synthetic providers for --suite as resources:attributes:blocks:depth (default: {})".format(
+        ",".join(":".join(str(n) for n in scenario) for scenario in SUITE_SCENARIOS)))
+    parser.add_argument("--handler-imports", metavar="DIR", help="measure the import time of the generated handlers in a provider directory (eg. resources/aviatrix) instead")
+    args = parser.parse_args()
+
+    if args.handler_imports:
+        bench_handler_imports(Path(args.handler_imports), args.repeat)
+        return
+
+    template_path = Path("handlers.py.template").absolute()
+    runtime_path = Path("handlers_runtime.py").absolute()
+    scaffold_path = Path("scaffold").absolute()
+    generate.exec_call = stub_exec_call
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shutil.copy(template_path, tmpdir)
+        shutil.copy(runtime_path, tmpdir)
+        shutil.copytree(scaffold_path, Path(tmpdir) / "scaffold")
+        os.chdir(tmpdir)
+        try:
+            if args.suite:
+                scenarios = [tuple(int(n) for n in scenario.split(":")) for scenario in args.scenarios.split(",")] if args.scenarios else SUITE_SCENARIOS
+                bench_suite(scenarios, args.repeat)
+            else:
+                bench_doc_merge(args.attributes, args.blocks, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
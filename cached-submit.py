@@ -0,0 +1,97 @@
+"""
+Runs `cfn submit` in a resource project directory with the dependencies of the handler package taken from a shared
+cache. The Python plugin of the CloudFormation CLI installs the requirements of every resource package from scratch
+(in Docker by default), although all generated packages have the same requirements. Here the installed dependencies
+are kept in <cache directory>/dependencies/<hash>, keyed by a hash of the runtime, the build mode and requirements.txt,
+and copied into the build directory of every package with the same requirements, so that packaging a type only adds
+its own handler code. Must be run with the Python interpreter the CloudFormation CLI is installed in.
+
+Usage: python3 cached-submit.py <directory> --cache-dir <cache directory> [<cfn submit arguments>]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from rpdk.core.cli import main as cfn_main
+from rpdk.python.codegen import Python36LanguagePlugin
+
+
+def dependency_key(plugin, base_path):
+    """
+    Computes the cache key of the dependencies of a resource package.
+
+    Args:
+        plugin (Python36LanguagePlugin): The language plugin building the package.
+        base_path (Path): The resource project directory.
+
+    Returns:
+        str: The hex digest of the runtime, the build mode and the requirements.
+    """
+    digest = hashlib.sha256()
+    digest.update("{}|{}|".format(plugin.RUNTIME, bool(plugin._use_docker)).encode("utf-8"))
+    digest.update((base_path / "requirements.txt").read_bytes())
+    return digest.hexdigest()
+
+
+def link_or_copy(src, dst):
+    """
+    Hard links a file if the source and the destination are on the same file system, otherwise copies it.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def use_dependency_cache(cache_dir):
+    """
+    Replaces the dependency build of the Python plugin with one that reuses the dependencies of earlier builds.
+
+    Args:
+        cache_dir (Path): The directory holding the cached dependencies.
+    """
+    build = Python36LanguagePlugin._build
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def cached_build(self, base_path):
+        cached_path = cache_dir / dependency_key(self, base_path)
+        build_path = base_path / "build"
+
+        if cached_path.is_dir():
+            print("Using the cached dependencies in {}".format(cached_path), file=sys.stderr)
+            shutil.copytree(cached_path, build_path, copy_function=link_or_copy)
+            return
+
+        build(self, base_path)
+
+        # concurrent builds of the same requirements may race to fill the cache, the first one to be renamed wins
+        tmp_dir = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".build-"))
+        try:
+            shutil.copytree(build_path, tmp_dir / "build", copy_function=link_or_copy)
+            os.rename(tmp_dir / "build", cached_path)
+        except OSError:
+            pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    Python36LanguagePlugin._build = cached_build
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs cfn submit with the dependencies of the package taken from a shared cache.")
+    parser.add_argument("directory", help="the resource project directory")
+    parser.add_argument("--cache-dir", required=True, help="the root of the dependency cache")
+    args, cfn_args = parser.parse_known_args()
+
+    use_dependency_cache(Path(args.cache_dir).absolute() / "dependencies")
+
+    os.chdir(args.directory)
+    cfn_main(["submit"] + cfn_args)
+
+
+if __name__ == "__main__":
+    main()
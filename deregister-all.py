@@ -1,38 +1,104 @@
-import subprocess
-from pathlib import Path
-import boto3
+"""
+Deregisters the registered TF::Aviatrix::* resource types from CloudFormation. The non-default versions of a type are
+deregistered before the type itself, as CloudFormation refuses to deregister a type that still has other versions.
+Types are deregistered in parallel, and throttled requests are retried with an adaptive backoff.
+
+Usage: python3 deregister-all.py [<region>] [--jobs 8]
+"""
+import argparse
+import concurrent.futures
 import sys
 
-session = boto3.session.Session()
-default_region = session.region_name
-# Set the path to the aviatrix resources directory
-aviatrix_resources_dir = Path("resources/aviatrix")
-
-# Function to deregister a resource
-def deregister_resource(resource_name, region):
-    try:
-        # Run the AWS CLI command to deregister the resource type
-        subprocess.run(['aws', 'cloudformation', 'deregister-type', '--region', region, '--type-name', resource_name, '--type', 'RESOURCE'], check=True)
-        print(f"Successfully deregistered {resource_name}")
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to deregister {resource_name}: {e}")
-
-# Get the region from the command line argument or default to the AWS profile's default region
-region = sys.argv[1] if len(sys.argv) > 1 else default_region
-
-# Ensure there is a default region available
-if not region:
-    print("No default region found in AWS configuration and no region argument provided.")
-    sys.exit(1)
-
-# List all resource directories in the aviatrix resources directory
-resource_dirs = [f for f in aviatrix_resources_dir.iterdir() if f.is_dir()]
-
-# Loop through the resource directories and deregister each one
-for resource_dir in resource_dirs:
-    # Convert dashes in resource directory names to two colons
-    # Ensure that 'TF::Aviatrix::' is not prefixed twice
-    resource_name = resource_dir.name.replace('-', '::')
-    if not resource_name.startswith('TF::Aviatrix::'):
-        resource_name = f"TF::Aviatrix::{resource_name}"
-    deregister_resource(resource_name, region)
\ No newline at end of file
+import boto3
+from botocore.config import Config
+
+TYPE_PREFIX = "TF::Aviatrix::"
+
+BOTO_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 10})
+
+
+def registered_types(cfn_client, prefix):
+    """
+    Lists the private resource types registered in the region.
+
+    Args:
+        cfn_client: The CloudFormation client.
+        prefix (str): The type name prefix.
+
+    Returns:
+        list: The type names.
+    """
+    type_names = []
+    for page in cfn_client.get_paginator("list_types").paginate(Visibility='PRIVATE', Type='RESOURCE', Filters={'TypeNamePrefix': prefix}):
+        type_names += [summary['TypeName'] for summary in page['TypeSummaries']]
+
+    return sorted(set(type_names))
+
+
+def deregister_type(cfn_client, type_name):
+    """
+    Deregisters the non-default versions of a resource type and then the type itself.
+
+    Args:
+        cfn_client: The CloudFormation client.
+        type_name (str): The resource type name.
+
+    Returns:
+        int: The number of non-default versions deregistered.
+    """
+    # botocore has no paginator for ListTypeVersions
+    versions = []
+    kwargs = {'Type': 'RESOURCE', 'TypeName': type_name}
+    while True:
+        page = cfn_client.list_type_versions(**kwargs)
+        versions += page['TypeVersionSummaries']
+        if not page.get('NextToken'):
+            break
+        kwargs['NextToken'] = page['NextToken']
+
+    other_versions = [version['Arn'] for version in versions if not version.get('IsDefaultVersion')]
+    for arn in other_versions:
+        cfn_client.deregister_type(Arn=arn)
+
+    cfn_client.deregister_type(Type='RESOURCE', TypeName=type_name)
+    return len(other_versions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deregisters the TF::Aviatrix::* resource types from CloudFormation.")
+    parser.add_argument("region", nargs="?", help="the region to deregister the types from (default: the region of the AWS profile)")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="the number of types deregistered in parallel (default: 8)")
+    parser.add_argument("--prefix", default=TYPE_PREFIX, help="the prefix of the type names to deregister (default: %(default)s)")
+    args = parser.parse_args()
+
+    # Get the region from the command line argument or default to the AWS profile's default region
+    region = args.region or boto3.session.Session().region_name
+
+    # Ensure there is a default region available
+    if not region:
+        print("No default region found in AWS configuration and no region argument provided.")
+        sys.exit(1)
+
+    cfn_client = boto3.client("cloudformation", region_name=region, config=BOTO_CONFIG)
+    type_names = registered_types(cfn_client, args.prefix)
+    print("Deregistering {} resource types from {}...".format(len(type_names), region))
+
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(deregister_type, cfn_client, type_name): type_name for type_name in type_names}
+        for future in concurrent.futures.as_completed(futures):
+            type_name = futures[future]
+            try:
+                versions = future.result()
+                print("Successfully deregistered {}{}".format(type_name, " and {} other versions".format(versions) if versions else ""))
+            except Exception as e:
+                failed.append(type_name)
+                print("Failed to deregister {}: {}".format(type_name, e))
+
+    print("Deregistered {} of {} resource types".format(len(type_names) - len(failed), len(type_names)))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,18 @@
 This script contains various utility functions for generating CloudFormation templates from Terraform code.
 It includes functions for converting Terraform types to CloudFormation types, executing shell commands, and generating JSON schemas for CloudFormation resources.
 """
+import argparse
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
 import requests
 import subprocess
 import os
 import pprint
 import json
 import re
+import shutil
 import tempfile
 import time
 import sys, traceback
@@ -16,10 +22,68 @@ import re
 from pathlib import Path
 
 provider_avx = 'Aviatrix'
+type_prefix = 'TF'
 
+# Bump whenever a change to the generator alters its output, so that every resource type is regenerated
+GENERATOR_VERSION = "8"
+MANIFEST_FILENAME = ".generate-manifest.json"
+
+# Expected duration of an operation in seconds, used by the handlers to schedule their progress polls. The resource
+# types that launch cloud instances or networks take minutes, all others (including the policies, NAT rules, users and
+# attachments of those) are controller API calls and take seconds. Names are matched whole, not as substrings.
+SLOW_RESOURCE_PATTERN = re.compile(r'^aviatrix_('
+    r'gateway|spoke_gateway|transit_gateway|spoke_ha_gateway|transit_ha_gateway|'
+    r'edge_(spoke|transit|gateway_selfmanaged|csp|equinix|platform|neo|megaport|zededa)(_ha)?|'
+    r'firewall_instance|vpc|aws_tgw|copilot_(simple|fault_tolerant)_deployment'
+    r')$')
+SLOW_RESOURCE_DURATION = 600
+DEFAULT_RESOURCE_DURATION = 15
+
+
+def set_type_prefix(prefix):
+    """
+    Sets the prefix used for the generated CloudFormation type names (eg. TF::Aviatrix::Account).
+
+    Args:
+        prefix (str): The type name prefix.
+    """
+    global type_prefix
+    type_prefix = prefix
+
+    # the cached type names embed the prefix
+    tf_type_to_cfn_type.cache_clear()
+    cfn_type_names.cache_clear()
+
+
+def init_worker(prefix):
+    """
+    Initializes a generator worker process with the type name prefix and empty name caches, so that the cache
+    statistics it reports only cover its own work.
+
+    Args:
+        prefix (str): The type name prefix.
+    """
+    set_type_prefix(prefix)
+    tf_to_cfn_str.cache_clear()
+
+
+def name_cache_stats():
+    """
+    Returns the hit and miss counts of the name conversion caches.
+
+    Returns:
+        dict: The (hits, misses) tuple keyed by function name.
+    """
+    return {fn.__name__: (fn.cache_info().hits, fn.cache_info().misses) for fn in (tf_to_cfn_str, tf_type_to_cfn_type, cfn_type_names)}
+
+
+CFN_STR_PATTERN = re.compile(r'(?:^|_)(\w)')
+
+@functools.lru_cache(maxsize=8192)
 def tf_to_cfn_str(obj):
     """
     Converts a Terraform string to a CloudFormation string by converting underscores to camelCase.
+    Conversions are cached, as the same attribute and block names recur across resources.
 
     Args:
         obj (str): The Terraform string to convert.
@@ -27,9 +91,10 @@ def tf_to_cfn_str(obj):
     Returns:
         str: The CloudFormation string.
     """
-    return re.sub(r'(?:^|_)(\w)', lambda x: x.group(1).upper(), obj)
+    return CFN_STR_PATTERN.sub(lambda x: x.group(1).upper(), obj)
 
 
+@functools.lru_cache(maxsize=1024)
 def tf_type_to_cfn_type(tf_name, provider_name):
     """
     Converts a Terraform resource type name to a CloudFormation resource type name.
@@ -44,11 +109,7 @@ def tf_type_to_cfn_type(tf_name, provider_name):
     split_provider_name = tf_name.split("_")
     split_provider_name.pop(0)
 
-    prefix = "TF"
-    if len(sys.argv) > 2:
-        prefix = sys.argv[2]
-
-    return prefix + "::" + provider_avx + "::" + tf_to_cfn_str("_".join(split_provider_name))
+    return type_prefix + "::" + provider_avx + "::" + tf_to_cfn_str("_".join(split_provider_name))
 
 
 import subprocess
@@ -82,7 +143,53 @@ def exec_call(args, cwd):
     return stdout
 
 
-def jsonschema_type(attrtype, definitions, parentname):
+class DefinitionRegistry:
+    """
+    Names the definitions generated for object and map types, reusing the existing definition when a structurally
+    identical one is registered again.
+    """
+
+    def __init__(self, definitions):
+        """
+        Args:
+        - definitions (dict): The definitions of the schema, which registered definitions are added to.
+        """
+        self.definitions = definitions
+        self.shapes = {}
+        self.counts = {}
+
+    def register(self, parentname, definition):
+        """
+        Adds a definition, unless an identical one has already been registered.
+
+        Args:
+        - parentname (str): The name of the attribute the definition is generated for.
+        - definition (dict): The definition.
+
+        Returns:
+        - str: The name of the definition.
+        """
+        shape = json.dumps(definition, sort_keys=True)
+        if shape in self.shapes:
+            defname, registered = self.shapes[shape]
+            # block definitions may have replaced it since
+            if self.definitions.get(defname) is registered:
+                return defname
+
+        defcount = self.counts.get(parentname, 0) + 1
+        defname = "{}Definition".format(parentname) if defcount == 1 else "{}Definition{}".format(parentname, defcount)
+        while defname in self.definitions:
+            defcount += 1
+            defname = "{}Definition{}".format(parentname, defcount)
+        self.counts[parentname] = defcount
+
+        self.definitions[defname] = definition
+        self.shapes[shape] = (defname, definition)
+
+        return defname
+
+
+def jsonschema_type(attrtype, definitions, parentname, registry=None):
     """
     Given an attribute type, generate a JSON schema for it.
 
@@ -90,10 +197,14 @@ def jsonschema_type(attrtype, definitions, parentname):
     - attrtype (str): The attribute type to generate a JSON schema for.
     - definitions (dict): A dictionary of JSON schema definitions.
     - parentname (str): The name of the parent attribute.
+    - registry (DefinitionRegistry): The registry of the definitions, shared across the attributes of a schema so that identical objects are defined once.
 
     Returns:
     - A tuple containing the JSON schema for the attribute type and the updated definitions dictionary.
     """
+    if registry is None:
+        registry = DefinitionRegistry(definitions)
+
     if attrtype == "string":
         return {
             'type': 'string'
@@ -107,14 +218,14 @@ def jsonschema_type(attrtype, definitions, parentname):
             'type': 'boolean'
         }, definitions
     elif len(attrtype) == 2 and attrtype[0] == "list":
-        items, definitions = jsonschema_type(attrtype[1], definitions, parentname)
+        items, definitions = jsonschema_type(attrtype[1], definitions, parentname, registry)
         return {
             'type': 'array',
             'insertionOrder': False,
             'items': items
         }, definitions
     elif len(attrtype) == 2 and attrtype[0] == "set":
-        items, definitions = jsonschema_type(attrtype[1], definitions, parentname)
+        items, definitions = jsonschema_type(attrtype[1], definitions, parentname, registry)
         return {
             'type': 'array',
             'insertionOrder': True,
@@ -124,33 +235,21 @@ def jsonschema_type(attrtype, definitions, parentname):
         properties = {}
         for k,v in attrtype[1].items():
             cfnattrname = tf_to_cfn_str(k)
-            properties[cfnattrname], definitions = jsonschema_type(v, definitions, parentname)
-
-        defcount = 1
-        defname = "{}Definition".format(parentname)
-        while defname in definitions:
-            defcount += 1
-            defname = "{}Definition{}".format(parentname, defcount)
+            properties[cfnattrname], definitions = jsonschema_type(v, definitions, parentname, registry)
 
-        definitions[defname] = {
+        defname = registry.register(parentname, {
             'type': 'object',
             'additionalProperties': False,
             'properties': properties
-        }
+        })
 
         return {
             '$ref': '#/definitions/{}'.format(defname)
         }, definitions
     elif len(attrtype) == 2 and attrtype[0] == "map":
-        mapvalue, definitions = jsonschema_type(attrtype[1], definitions, parentname)
+        mapvalue, definitions = jsonschema_type(attrtype[1], definitions, parentname, registry)
 
-        defcount = 1
-        defname = "{}Definition".format(parentname)
-        while defname in definitions:
-            defcount += 1
-            defname = "{}Definition{}".format(parentname, defcount)
-
-        definitions[defname] = {
+        defname = registry.register(parentname, {
             'type': 'object',
             'additionalProperties': False,
             'properties': {
@@ -163,7 +262,7 @@ def jsonschema_type(attrtype, definitions, parentname):
                 'MapKey',
                 'MapValue'
             ]
-        }
+        })
 
         return {
             'type': 'array',
@@ -222,528 +321,1254 @@ def generate_empty_override(schema, definition):
     return ret
 
 
-def process_provider(provider_type):
+@functools.lru_cache(maxsize=None)
+def read_scaffold_template(filename):
     """
-    Downloads the latest version of Aviatrix Terraform provider and generates a CloudFormation equivalent for each resource in the provider.
+    Reads a project template from the scaffold directory, once per process.
 
     Args:
-    provider_type (str): The name of the Terraform provider to generate CloudFormation resources for.
+        filename (str): The name of the template file.
 
     Returns:
-    None
+        str: The contents of the template.
     """
-    tmpdir = tempfile.TemporaryDirectory()
-    tempdir = Path(tmpdir.name)
+    with open(Path("scaffold") / filename, "r") as f:
+        return f.read()
 
-    provider_data = requests.get("https://registry.terraform.io/v2/providers?filter%5Bname%5D={}&filter%5Bmoved%5D=true&filter%5Btier%5D=official%2Cpartner".format(provider_type)).json()
-    if len(provider_data["data"]) == 0:
-        print("Provider data not found for {}".format(provider_type))
-        return
 
-    with open(tempdir / "base.tf", "w") as f:
-        f.write('''
-    terraform {{
-        required_providers {{
-            {provider} = {{
-                source = "{source}"
-            }}
-        }}
-    }}
+def scaffold_project(providerdir, cfntypename):
+    """
+    Writes the project layout that `cfn init --artifact-type RESOURCE python37 --use-docker` would create for a type,
+    without launching the CLI. The schema, handlers.py and the files created by `cfn generate` are left to the generator.
 
-    provider "{provider}" {{}}
-        '''.format(provider=provider_type, source=provider_data["data"][0]["attributes"]["full-name"]))
+    Args:
+        providerdir (pathlib.Path): The project directory.
+        cfntypename (str): The CloudFormation type name.
+    """
+    schemafilename = cfntypename.replace("::", "-").lower() + ".json"
+    packagename = cfntypename.replace("::", "_").lower()
+
+    def render(filename):
+        return read_scaffold_template(filename).replace("###CFNTYPENAME###", cfntypename).replace("###SCHEMAFILENAME###", schemafilename).replace("###PACKAGENAME###", packagename)
+
+    rpdk_config = {
+        "artifact_type": "RESOURCE",
+        "typeName": cfntypename,
+        "language": "python37",
+        "runtime": "python3.7",
+        "entrypoint": packagename + ".handlers.resource",
+        "testEntrypoint": packagename + ".handlers.test_entrypoint",
+        "settings": {
+            "version": False,
+            "subparser_name": "python37",
+            "verbose": 0,
+            "force": False,
+            "type_name": cfntypename,
+            "artifact_type": "RESOURCE",
+            "endpoint_url": None,
+            "region": None,
+            "target_schemas": [],
+            "profile": None,
+            "use_docker": True,
+            "language": "python37",
+            "protocolVersion": "2.0.0"
+        },
+        "canarySettings": {
+            "contract_test_file_names": [
+                "inputs_1.json"
+            ]
+        }
+    }
+
+    (providerdir / "src" / packagename).mkdir(parents=True, exist_ok=True)
+    (providerdir / "example_inputs").mkdir(exist_ok=True)
+
+    files = {
+        ".rpdk-config": json.dumps(rpdk_config, indent=4) + "\n",
+        ".gitignore": render("gitignore.template"),
+        "README.md": render("README.md.template"),
+        "requirements.txt": render("requirements.txt.template"),
+        "template.yml": render("template.yml.template"),
+        "src/{}/__init__.py".format(packagename): "",
+    }
+    for suffix in ("create", "update", "invalid"):
+        files["example_inputs/inputs_1_{}.json".format(suffix)] = render("example_inputs.json.template")
+
+    for filename, contents in files.items():
+        with open(providerdir / filename, "w") as f:
+            f.write(contents)
+
+
+def expected_duration(tf_type, tf_schema):
+    """
+    Estimates how long a create, update or delete of a resource type takes, as a hint for the progress polling of its
+    handlers.
+
+    Args:
+        tf_type (str): The Terraform resource type name.
+        tf_schema (dict): The Terraform schema block of the resource.
+
+    Returns:
+        int: The expected duration in seconds.
+    """
+    if SLOW_RESOURCE_PATTERN.search(tf_type) or 'timeouts' in tf_schema['block'].get('block_types', {}):
+        return SLOW_RESOURCE_DURATION
+    return DEFAULT_RESOURCE_DURATION
+
+
+@functools.lru_cache(maxsize=1024)
+def cfn_type_names(tf_name, provider_type):
+    """
+    Derives the CloudFormation type name and the resource directory name of a Terraform resource type.
+
+    Args:
+        tf_name (str): The Terraform resource type name.
+        provider_type (str): The name of the Terraform provider.
+
+    Returns:
+        tuple: The CloudFormation type name (eg. TF::Aviatrix::Account) and directory name (eg. TF-Aviatrix-Account).
+    """
+    endnaming = tf_to_cfn_str(tf_name)
+    if tf_name.startswith(provider_type + "_"):
+        endnaming = tf_to_cfn_str(tf_name[(len(provider_type)+1):])
+
+    return type_prefix + "::" + provider_avx + "::" + endnaming, type_prefix + "-" + provider_avx + "-" + endnaming
 
-    print("Downloading latest {} provider version...".format(provider_type))
-    exec_call(['terraform', 'init'], tempdir.absolute())
-    tfschemadata = exec_call(['terraform', 'providers', 'schema', '-json'], tempdir.absolute())
-    tfschema = json.loads(tfschemadata.decode("utf-8").strip())
 
-    exec_call(['git', 'clone', provider_data["data"][0]["attributes"]["source"], provider_type], tempdir.absolute())
+def generate_resource(task):
+    """
+    Generates the CloudFormation resource project for a single Terraform resource type.
+
+    Args:
+    - task (tuple): The Terraform type name, its schema block, the provider type, the provider data, the parsed doc entry (or None),
+      whether `cfn generate` is left to a later batch_generate_models call, the executor coalescing window in seconds
+      (0 to invoke the executor once per operation) and whether state objects are stored gzip-compressed.
+
+    Returns:
+    - tuple: The CloudFormation type name and the formatted traceback if the generation failed, otherwise None.
+    """
+    k, v, provider_type, provider_data, doc_resource, batch, coalesce_window, compress_state = task
+
+    cfntypename, cfndirname = cfn_type_names(k, provider_type)
 
     outstandingblocks = {}
-    schema = {}
-    
-    doc_resources = generate_docs(tempdir, provider_type, tfschema, provider_data)
 
-    for k,v in tfschema['provider_schemas']["registry.terraform.io/{}".format(provider_data["data"][0]["attributes"]["full-name"].lower())]['resource_schemas'].items():
-        endnaming = tf_to_cfn_str(k)
-        if k.startswith(provider_type + "_"):
-            endnaming = tf_to_cfn_str(k[(len(provider_type)+1):])
+    try:
+        providerdir = Path('.') / 'resources' / provider_type / cfndirname
+
+        getatt = []
+        allprops = []
+
+        if not providerdir.exists():
+            providerdir.mkdir(parents=True, exist_ok=True)
+            scaffold_project(providerdir, cfntypename)
+
+        schema = {
+            "typeName": cfntypename,
+            "description": "CloudFormation equivalent of {}".format(k),
+            "sourceUrl": "https://github.com/nickda/aviatrix-cfn-types.git",
+            "documentationUrl": "https://github.com/nickda/aviatrix-cfn-types/blob/docs/resources/{}/{}/docs/README.md".format(provider_type, cfndirname),
+            "definitions": {},
+            "properties": {
+                "tfcfnid": {
+                    "description": "Internal identifier for tracking resource changes. Do not use.",
+                    "type": "string"
+                }
+            },
+            "additionalProperties": False,
+            "required": [],
+            "readOnlyProperties": [
+                "/properties/tfcfnid"
+            ],
+            "primaryIdentifier": [
+                "/properties/tfcfnid"
+            ],
+            "handlers": {
+                "create": {
+                    "permissions": [
+                        "s3:GetObject",
+                        "s3:PutObject",
+                        "s3:DeleteObject",
+                        "lambda:InvokeFunction"
+                    ]
+                },
+                "read": {
+                    "permissions": [
+                        "s3:GetObject"
+                    ]
+                },
+                "update": {
+                    "permissions": [
+                        "s3:GetObject",
+                        "s3:PutObject",
+                        "s3:DeleteObject",
+                        "lambda:InvokeFunction"
+                    ]
+                },
+                "delete": {
+                    "permissions": [
+                        "s3:GetObject",
+                        "s3:PutObject",
+                        "s3:DeleteObject",
+                        "lambda:InvokeFunction"
+                    ]
+                },
+                "list": {
+                    "permissions": [
+                        "s3:GetObject",
+                        "s3:PutObject",
+                        "s3:DeleteObject",
+                        "s3:ListBucket"
+                    ]
+                }
+            }
+        }
+        registry = DefinitionRegistry(schema['definitions'])
+
+        ## Temporarily disabled doc resource generation
+        if doc_resource and len(doc_resource['description']) > 10:
+            schema['description'] = doc_resource['description']
+            if len(schema['description']) > 1023:
+                schema['description'] = schema['description'][:1020] + "..."
+
+        if 'attributes' in v['block']:
+            for attrname,attr in v['block']['attributes'].items():
+                cfnattrname = tf_to_cfn_str(attrname)
+                attrtype = attr['type']
+
+                allprops.append(cfnattrname)
+
+                computed = False
+                optional = None
+
+                if attrname == "id":
+                    computed = True
+                    #schema['primaryIdentifier'] = ["/properties/Id"]
+                    schema['readOnlyProperties'].append("/properties/Id")
+                    getatt.append("Id")
+                else:
+                    if 'optional' in attr:
+                        if not attr['optional']:
+                            schema['required'].append(cfnattrname)
+                            optional = False
+                        else:
+                            optional = True
+                    elif 'required' in attr:
+                        if attr['required']:
+                            schema['required'].append(cfnattrname)
+                    if 'computed' in attr:
+                        if attr['computed']:
+                            computed = True
+                            if not optional:
+                                schema['readOnlyProperties'].append("/properties/" + cfnattrname)
+                                getatt.append(cfnattrname)
+                    if 'sensitive' in attr:
+                        if attr['sensitive']:
+                            if 'writeOnlyProperties' not in schema:
+                                schema['writeOnlyProperties'] = []
+                            schema['writeOnlyProperties'].append("/properties/" + cfnattrname)
+
+                schema['properties'][cfnattrname], schema['definitions'] = jsonschema_type(attrtype, schema['definitions'], cfnattrname, registry)
+
+                if doc_resource:
+                    description = doc_resource['argument_descriptions'].get((attrname, None)) or doc_resource['attribute_descriptions'].get((attrname, None))
+                    if description:
+                        schema['properties'][cfnattrname]['description'] = description
+
+        if 'block_types' in v['block']:
+            for blockname, block in v['block']['block_types'].items():
+                cfnblockname = tf_to_cfn_str(blockname)
 
-        prefix = "TF"
-        if len(sys.argv) > 2:
-            prefix = sys.argv[2]
-        
-        cfntypename = prefix + "::" + provider_avx + "::" + endnaming
-        cfndirname = prefix + "-" + provider_avx + "-" + endnaming
+                allprops.append(tf_to_cfn_str(cfnblockname))
 
-        try:
-            providerdir = Path('.') / 'resources' / provider_type / cfndirname
-
-            getatt = []
-            allprops = []
-
-            if not providerdir.exists():
-                providerdir.mkdir(parents=True, exist_ok=True)
-                exec_call(['cfn', 'init', '--type-name', cfntypename, '--artifact-type', 'RESOURCE', 'python37', '--use-docker'], providerdir.absolute())
-
-            schema = {
-                "typeName": cfntypename,
-                "description": "CloudFormation equivalent of {}".format(k),
-                "sourceUrl": "https://github.com/nickda/aviatrix-cfn-types.git",
-                "documentationUrl": "https://github.com/nickda/aviatrix-cfn-types/blob/docs/resources/{}/{}/docs/README.md".format(provider_type, cfndirname),
-                "definitions": {},
-                "properties": {
-                    "tfcfnid": {
-                        "description": "Internal identifier for tracking resource changes. Do not use.",
-                        "type": "string"
+                if block['nesting_mode'] == "list":
+                    schema['properties'][cfnblockname] = {
+                        'type': 'array',
+                        'insertionOrder': False,
+                        'items': {
+                            '$ref': '#/definitions/' + cfnblockname + 'Definition'
+                        }
                     }
-                },
-                "additionalProperties": False,
-                "required": [],
-                "readOnlyProperties": [
-                    "/properties/tfcfnid"
-                ],
-                "primaryIdentifier": [
-                    "/properties/tfcfnid"
-                ],
-                "handlers": {
-                    "create": {
-                        "permissions": [
-                            "s3:GetObject",
-                            "s3:DeleteObject",
-                            "lambda:InvokeFunction"
-                        ]
-                    },
-                    "read": {
-                        "permissions": [
-                            "s3:GetObject"
-                        ]
-                    },
-                    "update": {
-                        "permissions": [
-                            "s3:GetObject",
-                            "s3:DeleteObject",
-                            "lambda:InvokeFunction"
-                        ]
-                    },
-                    "delete": {
-                        "permissions": [
-                            "s3:GetObject",
-                            "s3:DeleteObject",
-                            "lambda:InvokeFunction"
-                        ]
-                    },
-                    "list": {
-                        "permissions": [
-                            "s3:GetObject",
-                            "s3:ListBucket"
-                        ]
+                elif block['nesting_mode'] == "set":
+                    schema['properties'][cfnblockname] = {
+                        'type': 'array',
+                        'insertionOrder': True,
+                        'items': {
+                            '$ref': '#/definitions/' + cfnblockname + 'Definition'
+                        }
                     }
-                }
+                elif block['nesting_mode'] == "single":
+                    schema['properties'][cfnblockname] = {
+                        '$ref': '#/definitions/' + cfnblockname + 'Definition'
+                    }
+                else:
+                    print("Unknown nesting_mode: " + block['nesting_mode'])
+
+                if 'max_items' in block:
+                    schema['properties'][cfnblockname]['maxItems'] = block['max_items']
+                if 'min_items' in block:
+                    schema['properties'][cfnblockname]['minItems'] = block['min_items']
+
+            outstandingblocks.update(v['block']['block_types'])
+        
+        while len(outstandingblocks):
+            blockname = next(iter(outstandingblocks))
+            block = outstandingblocks.pop(blockname)
+            cfnblockname = tf_to_cfn_str(blockname)
+
+            schema['definitions']['{}Definition'.format(cfnblockname)] = {
+                'type': 'object',
+                'additionalProperties': False,
+                'properties': {},
+                'required': []
             }
-            ## Temporarily disabled doc resource generation
-            if k in doc_resources and len(doc_resources[k]['description']) > 10:
-                schema['description'] = doc_resources[k]['description']
-                if len(schema['description']) > 1023:
-                    schema['description'] = schema['description'][:1020] + "..."
-
-            if 'attributes' in v['block']:
-                for attrname,attr in v['block']['attributes'].items():
+
+            if 'attributes' in block['block']:
+                for attrname,attr in block['block']['attributes'].items():
                     cfnattrname = tf_to_cfn_str(attrname)
                     attrtype = attr['type']
 
-                    allprops.append(cfnattrname + "=None")
-
                     computed = False
                     optional = None
-
-                    if attrname == "id":
-                        computed = True
-                        #schema['primaryIdentifier'] = ["/properties/Id"]
-                        schema['readOnlyProperties'].append("/properties/Id")
-                        getatt.append("Id")
-                    else:
-                        if 'optional' in attr:
-                            if not attr['optional']:
-                                schema['required'].append(cfnattrname)
-                                optional = False
-                            else:
-                                optional = True
-                        elif 'required' in attr:
-                            if attr['required']:
-                                schema['required'].append(cfnattrname)
-                        if 'computed' in attr:
-                            if attr['computed']:
-                                computed = True
-                                if not optional:
-                                    schema['readOnlyProperties'].append("/properties/" + cfnattrname)
-                                    getatt.append(cfnattrname)
-                        if 'sensitive' in attr:
-                            if attr['sensitive']:
-                                if 'writeOnlyProperties' not in schema:
-                                    schema['writeOnlyProperties'] = []
-                                schema['writeOnlyProperties'].append("/properties/" + cfnattrname)
-
-                    schema['properties'][cfnattrname], schema['definitions'] = jsonschema_type(attrtype, schema['definitions'], cfnattrname)
-
-                    if k in doc_resources:
-                        for docarg in doc_resources[k]['arguments']:
-                            if docarg['name'] == attrname and docarg['property_of'] is None and docarg['description']:
-                                schema['properties'][cfnattrname]['description'] = docarg['description']
-
-            if 'block_types' in v['block']:
-                for blockname, block in v['block']['block_types'].items():
-                    cfnblockname = tf_to_cfn_str(blockname)
-
-                    allprops.append(tf_to_cfn_str(cfnblockname) + "=None")
-
-                    if block['nesting_mode'] == "list":
-                        schema['properties'][cfnblockname] = {
+                    if 'optional' in attr:
+                        if not attr['optional']:
+                            schema['definitions']['{}Definition'.format(cfnblockname)]['required'].append(cfnattrname)
+                            optional = False
+                        else:
+                            optional = True
+                    elif 'required' in attr:
+                        if attr['required']:
+                            schema['definitions']['{}Definition'.format(cfnblockname)]['required'].append(cfnattrname)
+                    if 'computed' in attr:
+                        if attr['computed']:
+                            computed = True
+                            if not optional:
+                                continue # read-only props in subdefs are skipped from model
+                    if 'sensitive' in attr:
+                        if attr['sensitive']:
+                            if 'writeOnlyProperties' not in schema:
+                                schema['writeOnlyProperties'] = []
+                            schema['writeOnlyProperties'].append("/definitions/" + cfnblockname + "Definition/" + cfnattrname)
+
+                    schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnattrname], schema['definitions'] = jsonschema_type(attrtype, schema['definitions'], cfnattrname, registry)
+
+                    if doc_resource and (attrname, blockname) in doc_resource['argument_descriptions']:
+                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnattrname]['description'] = doc_resource['argument_descriptions'][(attrname, blockname)]
+            
+            if 'block_types' in block['block']:
+                outstandingblocks.update(block['block']['block_types'])
+                for subblockname,subblock in block['block']['block_types'].items():
+                    cfnsubblockname = tf_to_cfn_str(subblockname)
+                    if subblock['nesting_mode'] == "list":
+                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname] = {
                             'type': 'array',
-                            'insertionOrder': False,
+                            'insertionOrder': True,
                             'items': {
-                                '$ref': '#/definitions/' + cfnblockname + 'Definition'
+                                '$ref': '#/definitions/' + cfnsubblockname + 'Definition'
                             }
                         }
-                    elif block['nesting_mode'] == "set":
-                        schema['properties'][cfnblockname] = {
+                    elif subblock['nesting_mode'] == "set":
+                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname] = {
                             'type': 'array',
-                            'insertionOrder': True,
+                            'insertionOrder': False,
                             'items': {
-                                '$ref': '#/definitions/' + cfnblockname + 'Definition'
+                                '$ref': '#/definitions/' + cfnsubblockname + 'Definition'
                             }
                         }
-                    elif block['nesting_mode'] == "single":
-                        schema['properties'][cfnblockname] = {
-                            '$ref': '#/definitions/' + cfnblockname + 'Definition'
+                    elif subblock['nesting_mode'] == "single":
+                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname] = {
+                            '$ref': '#/definitions/' + cfnsubblockname + 'Definition'
                         }
                     else:
-                        print("Unknown nesting_mode: " + block['nesting_mode'])
+                        print("Unknown subblock nesting_mode: " + subblock['nesting_mode'])
+
+                    if 'max_items' in subblock:
+                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname]['maxItems'] = subblock['max_items']
+                    if 'min_items' in subblock:
+                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname]['minItems'] = subblock['min_items']
+
+            if not bool(schema['definitions']['{}Definition'.format(cfnblockname)]['properties']):
+                if bool(block['block']):
+                    del schema['definitions']['{}Definition'.format(cfnblockname)] # no properties found
+                    print("Skipped propertyless block: " + cfnblockname)
+                    continue
+                else:
+                    schema['definitions']['{}Definition'.format(cfnblockname)]['properties']['IsPropertyDefined'] = {
+                        'type': 'boolean'
+                    }
+                    print("Retained propertyless block: " + cfnblockname)
+
+            # TODO: Block descriptions/max/min/etc.
+
+        # write overrides
+        override_block = {}
+        for propertyname, propertyblock in schema['properties'].items():
+            if '$ref' in propertyblock:
+                pass
+            elif propertyblock['type'] == "array" and '$ref' in propertyblock['items']:
+                definition = schema['definitions'][propertyblock['items']['$ref'].replace("#/definitions/", "")]
+                override_block['/' + propertyname] = [
+                    generate_empty_override(schema, definition)
+                ]
+        overrides = {
+            "CREATE": override_block,
+            "UPDATE": override_block
+        }
+        with open(providerdir / "overrides.json", "w") as f:
+            f.write(json.dumps(overrides))
 
-                    if 'max_items' in block:
-                        schema['properties'][cfnblockname]['maxItems'] = block['max_items']
-                    if 'min_items' in block:
-                        schema['properties'][cfnblockname]['minItems'] = block['min_items']
+        # write schema
+        with open(providerdir / (cfndirname.lower() + ".json"), "w") as f:
+            f.write(json.dumps(schema, indent=4))
+        
+        if not batch:
+            exec_call(['cfn', 'generate'], providerdir.absolute())
 
-                outstandingblocks.update(v['block']['block_types'])
-            
-            while len(outstandingblocks):
-                blockname = next(iter(outstandingblocks))
-                block = outstandingblocks.pop(blockname)
-                cfnblockname = tf_to_cfn_str(blockname)
+        # update handlers.py, its shared runtime and the type configuration the runtime is driven by
+        packagedir = providerdir / "src" / cfndirname.lower().replace("-","_")
+        with open("handlers.py.template", "r") as handlerstemplate:
+            with open(packagedir / "handlers.py", "w") as f:
+                f.write(handlerstemplate.read().replace("###CFNTYPENAME###",cfntypename))
+        shutil.copyfile("handlers_runtime.py", packagedir / "handlers_runtime.py")
+        with open(packagedir / "type_config.json", "w") as f:
+            f.write(json.dumps({
+                'terraformTypeName': k,
+                'providerFullName': provider_data["data"][0]["attributes"]["full-name"],
+                'providerTypeName': provider_type,
+                'returnValues': getatt,
+                'properties': allprops,
+                'expectedDuration': expected_duration(k, v),
+                'coalesceWindowSeconds': coalesce_window,
+                'compressState': compress_state
+            }, indent=4))
+
+        # exec_call(['cfn', 'submit', '--dry-run'], providerdir.absolute())
+    except Exception:
+        return cfntypename, traceback.format_exc()
+
+    return cfntypename, None
+
+
+def default_cache_dir():
+    """
+    Returns the default location of the provider cache.
 
-                schema['definitions']['{}Definition'.format(cfnblockname)] = {
-                    'type': 'object',
-                    'additionalProperties': False,
-                    'properties': {},
-                    'required': []
-                }
+    Returns:
+        pathlib.Path: The cache directory.
+    """
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "aviatrix-cfn-types"
 
-                if 'attributes' in block['block']:
-                    for attrname,attr in block['block']['attributes'].items():
-                        cfnattrname = tf_to_cfn_str(attrname)
-                        attrtype = attr['type']
-
-                        computed = False
-                        optional = None
-                        if 'optional' in attr:
-                            if not attr['optional']:
-                                schema['definitions']['{}Definition'.format(cfnblockname)]['required'].append(cfnattrname)
-                                optional = False
-                            else:
-                                optional = True
-                        elif 'required' in attr:
-                            if attr['required']:
-                                schema['definitions']['{}Definition'.format(cfnblockname)]['required'].append(cfnattrname)
-                        if 'computed' in attr:
-                            if attr['computed']:
-                                computed = True
-                                if not optional:
-                                    continue # read-only props in subdefs are skipped from model
-                        if 'sensitive' in attr:
-                            if attr['sensitive']:
-                                if 'writeOnlyProperties' not in schema:
-                                    schema['writeOnlyProperties'] = []
-                                schema['writeOnlyProperties'].append("/definitions/" + cfnblockname + "Definition/" + cfnattrname)
-
-                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnattrname], schema['definitions'] = jsonschema_type(attrtype, schema['definitions'], cfnattrname)
-
-                        if k in doc_resources:
-                            for docarg in doc_resources[k]['arguments']:
-                                if docarg['name'] == attrname and docarg['property_of'] == blockname and docarg['description']:
-                                    schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnattrname]['description'] = docarg['description']
-                
-                if 'block_types' in block['block']:
-                    outstandingblocks.update(block['block']['block_types'])
-                    for subblockname,subblock in block['block']['block_types'].items():
-                        cfnsubblockname = tf_to_cfn_str(subblockname)
-                        if subblock['nesting_mode'] == "list":
-                            schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname] = {
-                                'type': 'array',
-                                'insertionOrder': True,
-                                'items': {
-                                    '$ref': '#/definitions/' + cfnsubblockname + 'Definition'
-                                }
-                            }
-                        elif subblock['nesting_mode'] == "set":
-                            schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname] = {
-                                'type': 'array',
-                                'insertionOrder': False,
-                                'items': {
-                                    '$ref': '#/definitions/' + cfnsubblockname + 'Definition'
-                                }
-                            }
-                        elif subblock['nesting_mode'] == "single":
-                            schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname] = {
-                                '$ref': '#/definitions/' + cfnsubblockname + 'Definition'
-                            }
-                        else:
-                            print("Unknown subblock nesting_mode: " + subblock['nesting_mode'])
-
-                        if 'max_items' in subblock:
-                            schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname]['maxItems'] = subblock['max_items']
-                        if 'min_items' in subblock:
-                            schema['definitions']['{}Definition'.format(cfnblockname)]['properties'][cfnsubblockname]['minItems'] = subblock['min_items']
-
-                if not bool(schema['definitions']['{}Definition'.format(cfnblockname)]['properties']):
-                    if bool(block['block']):
-                        del schema['definitions']['{}Definition'.format(cfnblockname)] # no properties found
-                        print("Skipped propertyless block: " + cfnblockname)
-                        continue
-                    else:
-                        schema['definitions']['{}Definition'.format(cfnblockname)]['properties']['IsPropertyDefined'] = {
-                            'type': 'boolean'
-                        }
-                        print("Retained propertyless block: " + cfnblockname)
 
-                # TODO: Block descriptions/max/min/etc.
+def provider_cache_dir(cache_dir, full_name):
+    """
+    Returns the cache directory holding the cached versions of a provider.
 
-            # write overrides
-            override_block = {}
-            for propertyname, propertyblock in schema['properties'].items():
-                if '$ref' in propertyblock:
-                    pass
-                elif propertyblock['type'] == "array" and '$ref' in propertyblock['items']:
-                    definition = schema['definitions'][propertyblock['items']['$ref'].replace("#/definitions/", "")]
-                    override_block['/' + propertyname] = [
-                        generate_empty_override(schema, definition)
-                    ]
-            overrides = {
-                "CREATE": override_block,
-                "UPDATE": override_block
-            }
-            with open(providerdir / "overrides.json", "w") as f:
-                f.write(json.dumps(overrides))
+    Args:
+        cache_dir (pathlib.Path): The root of the provider cache.
+        full_name (str): The full name of the provider in the registry (eg. AviatrixSystems/aviatrix).
 
-            # write schema
-            with open(providerdir / (cfndirname.lower() + ".json"), "w") as f:
-                f.write(json.dumps(schema, indent=4))
-            
-            exec_call(['cfn', 'generate'], providerdir.absolute())
+    Returns:
+        pathlib.Path: The provider cache directory.
+    """
+    return cache_dir / "providers" / full_name.lower().replace("/", "_")
+
+
+def write_cache_file(path, contents):
+    """
+    Atomically writes a file in the cache, so that an interrupted run never leaves a truncated entry behind.
+
+    Args:
+        path (pathlib.Path): The path of the file.
+        contents (str): The contents of the file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmppath = path.with_name(path.name + ".tmp")
+    with open(tmppath, "w") as f:
+        f.write(contents)
+    os.replace(tmppath, path)
+
+
+def fetch_provider_data(provider_type, cache_dir, offline=False):
+    """
+    Retrieves the registry data of a provider, falling back to the cached response when offline.
+
+    Args:
+        provider_type (str): The name of the Terraform provider.
+        cache_dir (pathlib.Path): The root of the provider cache.
+        offline (bool): If true, only the cached response is used.
+
+    Returns:
+        dict: The registry response, or None if it is not available.
+    """
+    cache_path = cache_dir / "registry" / "{}.json".format(provider_type)
+
+    if offline:
+        try:
+            with open(cache_path, "r") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    provider_data = requests.get("https://registry.terraform.io/v2/providers?filter%5Bname%5D={}&filter%5Bmoved%5D=true&filter%5Btier%5D=official%2Cpartner".format(provider_type)).json()
+    write_cache_file(cache_path, json.dumps(provider_data))
+
+    return provider_data
+
+
+def resolve_provider_version(full_name, cache_dir, offline=False):
+    """
+    Determines the provider version to generate from. Online this is the latest version in the registry, offline
+    the most recently used cached version that has a schema.
+
+    Args:
+        full_name (str): The full name of the provider in the registry.
+        cache_dir (pathlib.Path): The root of the provider cache.
+        offline (bool): If true, the version is picked from the cache.
+
+    Returns:
+        str: The provider version, or None if no version is available.
+    """
+    if not offline:
+        return requests.get("https://registry.terraform.io/v1/providers/{}".format(full_name)).json()["version"]
+
+    versions_dir = provider_cache_dir(cache_dir, full_name)
+    if not versions_dir.is_dir():
+        return None
+
+    cached_versions = [d for d in versions_dir.iterdir() if (d / "schema.json").exists()]
+    if len(cached_versions) == 0:
+        return None
+
+    return max(cached_versions, key=lambda d: d.stat().st_mtime).name
+
+
+def load_provider_schema(provider_type, full_name, version, version_dir, offline=False):
+    """
+    Loads the Terraform schema of a provider version from the cache, running terraform to retrieve it on a cache miss.
+
+    Args:
+        provider_type (str): The name of the Terraform provider.
+        full_name (str): The full name of the provider in the registry.
+        version (str): The provider version.
+        version_dir (pathlib.Path): The cache directory of the provider version.
+        offline (bool): If true, terraform is never run.
+
+    Returns:
+        dict: The Terraform provider schema, or None if it is not available.
+    """
+    schema_path = version_dir / "schema.json"
+    if schema_path.exists():
+        print("Using cached {} provider schema ({})".format(provider_type, version))
+        with open(schema_path, "r") as f:
+            return json.loads(f.read())
+
+    if offline:
+        return None
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tempdir = Path(tmpdir)
+
+        with open(tempdir / "base.tf", "w") as f:
+            f.write('''
+    terraform {{
+        required_providers {{
+            {provider} = {{
+                source = "{source}"
+                version = "{version}"
+            }}
+        }}
+    }}
+
+    provider "{provider}" {{}}
+        '''.format(provider=provider_type, source=full_name, version=version))
 
-            # update handlers.py
-            with open("handlers.py.template", "r") as handlerstemplate:
-                with open(providerdir / "src" / cfndirname.lower().replace("-","_") / "handlers.py", "w") as f:
-                    template = handlerstemplate.read().replace("###CFNTYPENAME###",cfntypename).replace("###TFTYPENAME###",k).replace("###PROVIDERFULLNAME###",provider_data["data"][0]["attributes"]["full-name"]).replace("###PROVIDERTYPENAME###",provider_type).replace("###GETATT###",json.dumps(getatt)).replace("###ALLPROPS###",', '.join(allprops))
-                    f.write(template)
+        print("Downloading {} provider version {}...".format(provider_type, version))
+        exec_call(['terraform', 'init'], tempdir.absolute())
+        tfschemadata = exec_call(['terraform', 'providers', 'schema', '-json'], tempdir.absolute())
 
-            # exec_call(['cfn', 'submit', '--dry-run'], providerdir.absolute())
+    tfschema = json.loads(tfschemadata.decode("utf-8").strip())
+    write_cache_file(schema_path, json.dumps(tfschema))
+
+    return tfschema
+
+
+def checkout_provider_docs(provider_type, source, version, version_dir, offline=False):
+    """
+    Makes a shallow, sparse checkout of the documentation directories of a provider version available in the cache.
+
+    Args:
+        provider_type (str): The name of the Terraform provider, used as the name of the checkout directory.
+        source (str): The git URL of the provider source.
+        version (str): The provider version.
+        version_dir (pathlib.Path): The cache directory of the provider version.
+        offline (bool): If true, nothing is cloned.
+    """
+    checkout_dir = version_dir / provider_type
+    if checkout_dir.exists() or offline:
+        return
+
+    tmp_checkout_dir = version_dir / (provider_type + ".tmp")
+    if tmp_checkout_dir.exists():
+        shutil.rmtree(tmp_checkout_dir)
+
+    clone_args = ['git', 'clone', '--depth', '1', '--filter=blob:none', '--sparse']
+    try:
+        exec_call(clone_args + ['--branch', 'v' + version, source, tmp_checkout_dir.name], version_dir.absolute())
+    except subprocess.CalledProcessError:
+        # no release tag, fall back to the default branch
+        if tmp_checkout_dir.exists():
+            shutil.rmtree(tmp_checkout_dir)
+        exec_call(clone_args + [source, tmp_checkout_dir.name], version_dir.absolute())
+    exec_call(['git', 'sparse-checkout', 'set', 'website/docs', 'docs'], tmp_checkout_dir.absolute())
 
-            print("Generated " + cfntypename)
-        except KeyboardInterrupt:
-            quit()
-        except:
-            traceback.print_exc(file=sys.stdout)
-            print("Failed to generate " + cfntypename)
+    os.replace(tmp_checkout_dir, checkout_dir)
+
+
+def evict_provider_cache(cache_dir, full_name, keep, current_version):
+    """
+    Removes all but the most recently used cached versions of a provider.
+
+    Args:
+        cache_dir (pathlib.Path): The root of the provider cache.
+        full_name (str): The full name of the provider in the registry.
+        keep (int): The number of versions to keep.
+        current_version (str): The version in use, which is never evicted.
+    """
+    versions_dir = provider_cache_dir(cache_dir, full_name)
+    cached_versions = sorted([d for d in versions_dir.iterdir() if d.is_dir()], key=lambda d: d.stat().st_mtime, reverse=True)
+
+    for version_dir in cached_versions[max(keep, 1):]:
+        if version_dir.name != current_version:
+            print("Evicting cached {} provider version {}".format(full_name, version_dir.name))
+            shutil.rmtree(version_dir)
+
+
+def process_provider(provider_type, jobs=1, force=False, cache_dir=None, offline=False, cache_keep=3, batch=False, coalesce_window=0, compress_state=False):
+    """
+    Downloads the latest version of Aviatrix Terraform provider and generates a CloudFormation equivalent for each resource in the provider.
+
+    Args:
+    provider_type (str): The name of the Terraform provider to generate CloudFormation resources for.
+    jobs (int): The number of worker processes used to generate the resources.
+    force (bool): If true, resource types are regenerated even if their fingerprint is unchanged.
+    cache_dir (pathlib.Path): The root of the provider cache (defaults to default_cache_dir()).
+    offline (bool): If true, the registry, terraform and git are not used and the provider is read from the cache.
+    cache_keep (int): The number of provider versions kept in the cache.
+    batch (bool): If true, `cfn generate` runs for all resources in long-lived batch-generate.py workers instead of once per resource.
+    coalesce_window (int): If set, the handlers queue their operations and the executor applies the operations queued within
+      this many seconds in one run.
+    compress_state (bool): If true, the handlers and the executor store state, status and index objects gzip-compressed.
+
+    Returns:
+    None
+    """
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+
+    provider_data = fetch_provider_data(provider_type, cache_dir, offline)
+    if provider_data is None:
+        print("No cached provider data available for {}".format(provider_type))
+        return
+    if len(provider_data["data"]) == 0:
+        print("Provider data not found for {}".format(provider_type))
+        return
+
+    full_name = provider_data["data"][0]["attributes"]["full-name"]
+    version = resolve_provider_version(full_name, cache_dir, offline)
+    if version is None:
+        print("No cached version of the {} provider available".format(provider_type))
+        return
+
+    version_dir = provider_cache_dir(cache_dir, full_name) / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+    os.utime(version_dir)
+
+    # the doc parsing workers are forked before the schema download thread is started
+    with (multiprocessing.Pool(jobs) if jobs > 1 else contextlib.nullcontext()) as doc_pool:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            # terraform downloads the schema while the docs are checked out and parsed
+            schema_future = executor.submit(load_provider_schema, provider_type, full_name, version, version_dir, offline)
+            checkout_provider_docs(provider_type, provider_data["data"][0]["attributes"]["source"], version, version_dir, offline)
+            doc_resources = parse_resource_docs(version_dir, provider_type, provider_data, doc_pool)
+            tfschema = schema_future.result()
+
+    if tfschema is None:
+        print("No cached schema available for the {} provider version {}".format(provider_type, version))
+        return
+
+    evict_provider_cache(cache_dir, full_name, cache_keep, version)
+
+    doc_resources = generate_docs(version_dir, provider_type, tfschema, provider_data, doc_resources)
+
+    manifest_path = Path('.') / 'resources' / provider_type / MANIFEST_FILENAME
+    manifest = {} if force else load_manifest(manifest_path)
+
+    with open("handlers.py.template", "r") as f:
+        handlers_template = f.read()
+    with open("handlers_runtime.py", "r") as f:
+        handlers_template += f.read()
+
+    resource_schemas = tfschema['provider_schemas']["registry.terraform.io/{}".format(provider_data["data"][0]["attributes"]["full-name"].lower())]['resource_schemas']
+    tasks = []
+    fingerprints = {}
+    skipped = 0
+    for k,v in resource_schemas.items():
+        fingerprints[k] = resource_fingerprint(k, v, provider_data, doc_resources.get(k), handlers_template, [coalesce_window, compress_state])
+        cfntypename, cfndirname = cfn_type_names(k, provider_type)
+        if manifest.get(k) == fingerprints[k] and (Path('.') / 'resources' / provider_type / cfndirname).exists():
+            skipped += 1
+            continue
+        tasks.append((k, v, provider_type, provider_data, doc_resources.get(k), batch, coalesce_window, compress_state))
+
+    if skipped:
+        print("Skipping {} unchanged resource types".format(skipped))
+
+    results, cache_stats = run_generation(tasks, jobs)
+
+    if batch:
+        directories = [(Path('.') / 'resources' / provider_type / cfn_type_names(task[0], provider_type)[1]).absolute() for task in tasks]
+        model_errors = batch_generate_models([str(directory) for directory, (cfntypename, error) in zip(directories, results) if not error], jobs)
+        for index, directory in enumerate(directories):
+            if model_errors.get(str(directory)):
+                print("Failed to generate models for {}: {}".format(results[index][0], model_errors[str(directory)]))
+                results[index] = (results[index][0], model_errors[str(directory)])
+
+    manifest = {k: fingerprint for k, fingerprint in manifest.items() if k in resource_schemas}
+    for task, (cfntypename, error) in zip(tasks, results):
+        if error:
+            manifest.pop(task[0], None)
+        else:
+            manifest[task[0]] = fingerprints[task[0]]
+    save_manifest(manifest_path, manifest)
+
+    failed = [cfntypename for cfntypename, error in results if error]
+    print("Generated {} of {} resource types".format(len(results) - len(failed), len(results)))
+    for cfntypename in failed:
+        print("  Failed: " + cfntypename)
+
+    for name in cache_stats[0]:
+        hits = sum(stats[name][0] for stats in cache_stats)
+        misses = sum(stats[name][1] for stats in cache_stats)
+        print("Name cache {}: {} hits, {} misses".format(name, hits, misses))
+
+
+def resource_fingerprint(tf_type, tf_schema, provider_data, doc_resource, handlers_template, handler_options=None):
+    """
+    Computes a content hash over everything that determines the generated output of a resource type.
+
+    Args:
+    - tf_type (str): The Terraform resource type name.
+    - tf_schema (dict): The Terraform schema block of the resource.
+    - provider_data (dict): The provider data.
+    - doc_resource (dict): The parsed doc entry of the resource, or None.
+    - handlers_template (str): The contents of handlers.py.template and handlers_runtime.py.
+    - handler_options (list): The generation options that end up in the handler configuration.
+
+    Returns:
+    - str: The hex digest of the fingerprint.
+    """
+    if doc_resource:
+        # the lookup indexes are derived from the arguments and attributes (and their tuple keys are not serializable)
+        doc_resource = {k: v for k, v in doc_resource.items() if k not in ('argument_descriptions', 'attribute_descriptions')}
+
+    content = json.dumps([
+        GENERATOR_VERSION,
+        type_prefix,
+        provider_data["data"][0]["attributes"]["full-name"],
+        tf_type,
+        tf_schema,
+        doc_resource,
+        handlers_template,
+        handler_options
+    ], sort_keys=True)
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def load_manifest(manifest_path):
+    """
+    Loads the fingerprint manifest of previously generated resource types.
+
+    Args:
+    - manifest_path (pathlib.Path): The path to the manifest file.
+
+    Returns:
+    - dict: The fingerprints keyed by Terraform resource type name, empty if there is no readable manifest.
+    """
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get('version') != GENERATOR_VERSION:
+        return {}
+
+    return manifest.get('resources', {})
+
+
+def save_manifest(manifest_path, manifest):
+    """
+    Writes the fingerprint manifest of the generated resource types.
+
+    Args:
+    - manifest_path (pathlib.Path): The path to the manifest file.
+    - manifest (dict): The fingerprints keyed by Terraform resource type name.
+    """
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "w") as f:
+        f.write(json.dumps({
+            'version': GENERATOR_VERSION,
+            'resources': manifest
+        }, indent=4, sort_keys=True))
+
+
+def cfn_python():
+    """
+    Determines the Python interpreter the CloudFormation CLI is installed with, from the shebang of the cfn entry point.
+
+    Returns:
+        list: The command to run the interpreter with, the current interpreter if it cannot be determined.
+    """
+    cfn_path = shutil.which("cfn")
+    if cfn_path:
+        try:
+            with open(cfn_path, "rb") as f:
+                shebang = f.readline().decode("utf-8").strip()
+            if shebang.startswith("#!") and "python" in shebang:
+                return shebang[2:].split()
+        except (OSError, UnicodeDecodeError):
+            pass
+
+    return [sys.executable]
+
+
+def batch_generate_models(directories, jobs):
+    """
+    Runs `cfn generate` for many resource directories in batch-generate.py workers, each of which starts the
+    CloudFormation CLI once, and reports the time taken per directory.
+
+    Args:
+    - directories (list): The resource project directories.
+    - jobs (int): The number of workers.
+
+    Returns:
+    - dict: The error message of every directory that failed, keyed by directory.
+    """
+    if len(directories) == 0:
+        return {}
+
+    command = cfn_python() + [str(Path("batch-generate.py").absolute())]
+    workers = max(1, min(jobs, len(directories)))
+
+    print("Generating models for {} resource types in {} batch workers...".format(len(directories), workers))
+    start = time.perf_counter()
+    procs = [subprocess.Popen(command + directories[i::workers], stdout=subprocess.PIPE) for i in range(workers)]
+
+    errors = {directory: "cfn generate did not report a result" for directory in directories}
+    for proc in procs:
+        stdout, _ = proc.communicate()
+        for line in stdout.decode("utf-8").splitlines():
+            result = json.loads(line)
+            errors[result['directory']] = result['error']
+            print("  {:8.2f}s {}{}".format(result['seconds'], Path(result['directory']).name, " (failed)" if result['error'] else ""))
+
+    print("Generated models in {:.2f}s".format(time.perf_counter() - start))
+
+    return {directory: error for directory, error in errors.items() if error}
+
+
+def generate_indexed_resource(indexed_task):
+    """
+    Pool entry point wrapping generate_resource so results can be put back in task order.
+
+    Args:
+    - indexed_task (tuple): The position of the task and the task itself.
+
+    Returns:
+    - tuple: The position of the task, the result of generate_resource, and the process ID and name cache statistics of the worker.
+    """
+    index, task = indexed_task
+    result = generate_resource(task)
+    return index, result, os.getpid(), name_cache_stats()
+
+
+def report_result(result):
+    """
+    Prints the outcome of a single resource generation.
+
+    Args:
+    - result (tuple): The CloudFormation type name and the traceback of the failure, if any.
+
+    Returns:
+    - tuple: The unchanged result.
+    """
+    cfntypename, error = result
+    if error:
+        sys.stdout.write(error)
+        print("Failed to generate " + cfntypename)
+    else:
+        print("Generated " + cfntypename)
+    return result
+
+
+def run_generation(tasks, jobs):
+    """
+    Runs generate_resource for every task, fanning out across a pool of worker processes when more than one job is requested.
+    A failing resource is reported and does not stop the remaining ones.
+
+    Args:
+    - tasks (list): The generate_resource tasks.
+    - jobs (int): The number of worker processes.
+
+    Returns:
+    - tuple: The result of each task, in task order, and the name cache statistics of the processes that ran them.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return [report_result(generate_resource(task)) for task in tasks], [name_cache_stats()]
+
+    results = [None] * len(tasks)
+    worker_cache_stats = {}
+    with multiprocessing.Pool(min(jobs, len(tasks)), initializer=init_worker, initargs=(type_prefix,)) as pool:
+        for index, result, pid, cache_stats in pool.imap_unordered(generate_indexed_resource, enumerate(tasks)):
+            results[index] = report_result(result)
+            worker_cache_stats[pid] = cache_stats
+
+    return results, list(worker_cache_stats.values()) + [name_cache_stats()]
 
 
 # Docs
+def iter_doc_sections(lines, classify):
+    """
+    Streams the lines of a Markdown document together with the section they belong to.
+
+    Args:
+    - lines (iterable): The lines of the document, eg. an open file.
+    - classify (callable): Returns the section started by a heading line, or None for any other line.
+
+    Yields:
+    - tuple: The current section, the line without its line ending, and whether the line is a heading.
+    """
+    section = ""
+    for line in lines:
+        line = line.rstrip("\n")
+        heading = classify(line)
+        if heading is not None:
+            section = heading
+        yield section, line, heading is not None
+
+
+def provider_doc_section(line):
+    """
+    Classifies a line of the provider index or provider reference documentation.
+
+    Args:
+    - line (str): The line.
+
+    Returns:
+    - str: The section started by the line, or None if the line is not a heading.
+    """
+    if line.startswith("## Argument Reference") or line.startswith("## Arguments Reference") or line.startswith("## Configuration Reference") or "the following arguments:" in line or "provide the following credentials:" in line:
+        return "arguments"
+    elif line.startswith("#"):
+        return ""
+    return None
+
+
+def finish_argument(argument):
+    """
+    Finalizes a documented argument once all of its description lines have been read, splitting the leading
+    (Required, ...) attributes off the description.
+
+    Args:
+    - argument (dict): The argument, updated in place.
+    """
+    argument_description = argument['description'].strip()
+    argument_attributes = []
+    if argument_description[0] == "(":
+        endbracked_index = argument_description.find(')')
+        argument_attributes = list(map(str.strip, argument_description[1:endbracked_index].split(",")))
+        argument_description = argument_description[endbracked_index+1:].strip()
+
+    if argument_description and len(argument_description) > 2:
+        if argument_description[-1] != ".":
+            argument_description += "."
+    else:
+        argument_description = None
+
+    argument['description'] = argument_description
+    argument['attributes'] = argument_attributes
+
+
 def process_resource_docs(provider_name, file_contents, provider_readme_items, provider_data):
     """
     Parses the resource documentation and returns a dictionary containing the resource type, description, example, arguments, and attributes.
+    The documentation is parsed in a single pass, so an open file can be passed in and is streamed.
 
     Args:
     - provider_name (str): The name of the provider.
-    - file_contents (str): The contents of the file.
+    - file_contents (str or iterable): The contents of the file, or its lines.
     - provider_readme_items (list): A list of provider readme items.
     - provider_data (dict): A dictionary containing the provider data.
 
     Returns:
-    - dict: A dictionary containing the resource type, description, example, arguments, and attributes.
+    - dict: A dictionary containing the resource type, description, example, arguments, and attributes, plus the
+      argument and attribute descriptions indexed by (name, property_of).
     """
-    section = ""
+    def classify(line):
+        if line.startswith("# " + provider_name) or line.startswith("# Resource: " + provider_name):
+            return "description"
+        elif line == "## Example Usage":
+            return "example"
+        elif line == "## Argument Reference":
+            return "arguments"
+        elif line == "## Attributes Reference":
+            return "attributes"
+        elif line.startswith("##"):
+            return ""
+        return None
 
     resource_type = ""
-    description = ""
-    example = ""
+    description = []
+    example = []
     arguments = []
-    argument_lines = []
     attributes = {}
 
-    lines = file_contents.split("\n")
-    for line in lines:
-        if line.startswith("# " + provider_name):
-            resource_type = line[2:].replace("\\", "")
-            section = "description"
-        elif line.startswith("# Resource: " + provider_name):
-            resource_type = line[len("# Resource: "):].replace("\\", "")
-            section = "description"
-        elif line == "## Example Usage":
-            section = "example"
-        elif line == "## Argument Reference":
-            section = "arguments"
-        elif line == "## Attributes Reference":
-            section = "attributes"
-        elif line.startswith("##"):
-            section = ""
+    argument_names = []
+    argument_block = None
+    open_arguments = [] # arguments still collecting description lines
+    block_header = None # a line ending with ":" opens the block of an argument it names if a blank line follows
+
+    if isinstance(file_contents, str):
+        file_contents = file_contents.split("\n")
+
+    for section, line, heading in iter_doc_sections(file_contents, classify):
+        if section != "arguments" and open_arguments:
+            for argument in open_arguments:
+                finish_argument(argument)
+            open_arguments = []
+
+        if heading:
+            if line.startswith("# " + provider_name):
+                resource_type = line[2:].replace("\\", "")
+            elif line.startswith("# Resource: " + provider_name):
+                resource_type = line[len("# Resource: "):].replace("\\", "")
         elif section == "description":
-            description += line + "\n"
+            description.append(line + "\n")
         elif section == "example":
-            example += line + "\n"
+            example.append(line + "\n")
         elif section == "arguments":
-            argument_lines.append(line)
+            stripped = line.strip()
+
+            if block_header is not None:
+                if stripped == "":
+                    for argument_name in argument_names:
+                        if "`{}`".format(argument_name) in block_header:
+                            argument_block = argument_name
+                block_header = None
+
+            # concat lines in newlines for description of attribute
+            if open_arguments:
+                if stripped != "" and not line.startswith("* ") and not line.startswith("- ") and not line.startswith("#"):
+                    for argument in open_arguments:
+                        argument['description'] += "\n" + stripped
+                else:
+                    for argument in open_arguments:
+                        finish_argument(argument)
+                    open_arguments = []
+
+            if stripped.startswith("* ") or stripped.startswith("- "):
+                startpos = stripped.find("`")
+                endpos = stripped.find("`", startpos+1)
+                if startpos != -1 and endpos != -1:
+                    argument_name = stripped[startpos+1:endpos]
+                    argument_names.append(argument_name)
+                    remainder = stripped[endpos+1:].strip()
+                    if remainder.startswith("- ") or remainder.startswith("= "):
+                        argument = {
+                            'name': argument_name,
+                            'description': remainder[2:],
+                            'property_of': argument_block,
+                            'attributes': []
+                        }
+                        arguments.append(argument)
+                        open_arguments.append(argument)
+
+            if stripped.endswith(":"):
+                block_header = line
         elif section == "attributes":
-            if line.strip().startswith("* "):
-                startpos = line.strip().find("`")
-                endpos = line.strip().find("`", startpos+1)
+            stripped = line.strip()
+            if stripped.startswith("* "):
+                startpos = stripped.find("`")
+                endpos = stripped.find("`", startpos+1)
                 if startpos != -1 and endpos != -1:
-                    attribute_name = line.strip()[startpos+1:endpos]
-                    if line.strip()[endpos+1:].strip().startswith("- ") or line.strip()[endpos+1:].strip().startswith("= "):
-                        attribute_description = line.strip()[endpos+1:].strip()[2:]
+                    attribute_name = stripped[startpos+1:endpos]
+                    remainder = stripped[endpos+1:].strip()
+                    if remainder.startswith("- ") or remainder.startswith("= "):
+                        attribute_description = remainder[2:]
                         if attribute_description[-1] != ".":
                             attribute_description += "."
                         attributes[attribute_name] = attribute_description
-    
-    # process arguments
-    argument_names = []
-    argument_block = None
-    for line_number, line in enumerate(argument_lines):
-        if line.strip().startswith("* ") or line.strip().startswith("- "):
-            startpos = line.strip().find("`")
-            endpos = line.strip().find("`", startpos+1)
-            if startpos != -1 and endpos != -1:
-                argument_name = line.strip()[startpos+1:endpos]
-                argument_names.append(argument_name)
-                if line.strip()[endpos+1:].strip().startswith("- ") or line.strip()[endpos+1:].strip().startswith("= "):
-                    argument_description = line.strip()[endpos+1:].strip()[2:]
-
-                    # concat lines in newlines for description of attribute
-                    line_num_iterator = 1
-                    while len(argument_lines) > line_number+line_num_iterator and (argument_lines[line_number+line_num_iterator].strip() != "" and not argument_lines[line_number+line_num_iterator].startswith("* ") and not argument_lines[line_number+line_num_iterator].startswith("#")):
-                        argument_description += "\n" + argument_lines[line_number+line_num_iterator].strip()
-                        line_num_iterator += 1
-
-                    argument_attributes = []
-                    argument_description = argument_description.strip()
-                    if argument_description[0] == "(":
-                        endbracked_index = argument_description.find(')')
-                        argument_attributes = map(str.strip, argument_description[1:endbracked_index].split(","))
-                        argument_description = argument_description[endbracked_index+1:].strip()
-
-                    if argument_description and len(argument_description) > 2:
-                        if argument_description[-1] != ".":
-                            argument_description += "."
-                    else:
-                        argument_description = None
-                    
-                    arguments.append({
-                        'name': argument_name,
-                        'description': argument_description,
-                        'property_of': argument_block,
-                        'attributes': argument_attributes
-                    })
-        if line.strip().endswith(":") and argument_lines[line_number+1].strip() == "":
-            for argument_name in argument_names:
-                if "`{}`".format(argument_name) in line:
-                    argument_block = argument_name
+
+    for argument in open_arguments:
+        finish_argument(argument)
 
     if resource_type != "":
         # if provider_name not in PROVIDERS_MAP:
         #     return
-        
-        description = description.strip()
+
+        description = "".join(description).strip()
+
+        # lookup indexes keyed by (name, property_of), the last documented description wins
+        argument_descriptions = {}
+        for argument in arguments:
+            if argument['description']:
+                argument_descriptions[(argument['name'], argument['property_of'])] = argument['description']
+        attribute_descriptions = {(name, None): attribute_description for name, attribute_description in attributes.items()}
 
         return {
             'resource_type': resource_type,
             'description': description,
-            'example': example,
+            'example': "".join(example),
             'arguments': arguments,
-            'attributes': attributes
+            'attributes': attributes,
+            'argument_descriptions': argument_descriptions,
+            'attribute_descriptions': attribute_descriptions
         }
-    
+
     return None
 
 
-def generate_docs(tempdir, provider_type, tfschema, provider_data):
+def read_provider_arguments(path):
     """
-    Generates documentation for the Aviatrix provider.
+    Reads the argument lines of the provider configuration from the provider index or provider reference documentation.
 
     Args:
-    - tempdir (pathlib.Path): The path to the temporary directory.
+    - path (pathlib.Path): The path to the documentation file.
+
+    Returns:
+    - list: The argument lines, starting from the first argument bullet.
+    """
+    arguments = []
+    first_argument_found = False
+    previous_section = ""
+
+    with open(path, 'r') as f:
+        for section, line, heading in iter_doc_sections(f, provider_doc_section):
+            if (line.startswith("*") or line.startswith("-")) and previous_section == "arguments":
+                first_argument_found = True
+            if not heading and section == "arguments" and first_argument_found and not "navigation to the left" in line:
+                if line.startswith("-"):
+                    line = "*" + line[1:]
+                arguments.append(line)
+            previous_section = section
+
+    return arguments
+
+
+def docs_paths(tempdir, provider_type):
+    """
+    Locates the documentation of a provider checkout, which is either in the legacy website/docs layout or in docs.
+
+    Args:
+    - tempdir (pathlib.Path): The directory containing the provider checkout.
     - provider_type (str): The type of provider.
-    - tfschema (dict): The Terraform schema.
-    - provider_data (dict): The provider data.
 
     Returns:
-    - ret (dict): A dictionary containing the resource properties.
+    - tuple: The paths to the resources directory, the provider index and the provider reference.
     """
     resources_path = (tempdir / provider_type / "website" / "docs" / "r").absolute()
     index_path = (tempdir / provider_type / "website" / "docs" / "index.html.markdown").absolute()
     provider_reference_path = (tempdir / provider_type / "website" / "docs" / "provider_reference.html.markdown").absolute()
-    provider_readme_items = []
-    ret = {}
 
     if not os.path.isdir(resources_path):
         resources_path = (tempdir / provider_type/ "docs" / "resources").absolute()
         index_path = (tempdir / provider_type / "docs" / "index.md").absolute()
         provider_reference_path = (tempdir / provider_type / "docs" / "provider_reference.html.markdown").absolute()
 
+    return resources_path, index_path, provider_reference_path
+
+
+def parse_resource_doc_file(task):
+    """
+    Parses a single resource documentation file.
+
+    Args:
+    - task (tuple): The path to the file, the type of provider and the provider data.
+
+    Returns:
+    - dict: The parsed resource documentation, or None if the file does not document a resource.
+    """
+    path, provider_type, provider_data = task
+    with open(path, 'r') as f:
+        return process_resource_docs(provider_type, f, [], provider_data)
+
+
+def parse_resource_docs(tempdir, provider_type, provider_data, pool=None):
+    """
+    Parses the documentation of every resource of a provider, spread across a pool of worker processes if one is given.
+
+    Args:
+    - tempdir (pathlib.Path): The directory containing the provider checkout.
+    - provider_type (str): The type of provider.
+    - provider_data (dict): The provider data.
+    - pool (multiprocessing.pool.Pool): The worker processes to parse the files with.
+
+    Returns:
+    - dict: The parsed resource documentation keyed by Terraform resource type name.
+    """
+    resources_path = docs_paths(tempdir, provider_type)[0]
+    ret = {}
+
+    if not os.path.isdir(resources_path):
+        return ret
+
+    files = [f for f in os.listdir(resources_path) if os.path.isfile(os.path.join(resources_path, f))]
+    tasks = [(os.path.join(resources_path, filename), provider_type, provider_data) for filename in files]
+
+    if pool is None or len(tasks) <= 1:
+        results = [parse_resource_doc_file(task) for task in tasks]
+    else:
+        results = pool.map(parse_resource_doc_file, tasks)
+
+    for resource_properties in results:
+        if resource_properties:
+            ret[resource_properties['resource_type']] = resource_properties
+
+    return ret
+
+
+def generate_docs(tempdir, provider_type, tfschema, provider_data, doc_resources=None):
+    """
+    Generates documentation for the Aviatrix provider.
+
+    Args:
+    - tempdir (pathlib.Path): The path to the temporary directory.
+    - provider_type (str): The type of provider.
+    - tfschema (dict): The Terraform schema.
+    - provider_data (dict): The provider data.
+    - doc_resources (dict): The resource documentation parsed by parse_resource_docs, parsed here if not provided.
+
+    Returns:
+    - ret (dict): A dictionary containing the resource properties.
+    """
+    resources_path, index_path, provider_reference_path = docs_paths(tempdir, provider_type)
+    provider_readme_items = []
+    ret = {}
+
     if os.path.isdir(resources_path):
         os.makedirs("aviatrix_provider_docs", exist_ok=True)
         with open(Path("aviatrix_provider_docs") / "README.md".format(provider_type), 'w') as provider_readme:
             readable_provider_name = provider_avx
             
             # provider info
-            with open(index_path, 'r') as f:
-                section = ""
-                first_argument_found = False
-                arguments = []
-                index_file_contents = f.read()
-                lines = index_file_contents.split("\n")
-                for line in lines:
-                    if line.startswith("*") and section == "arguments":
-                        first_argument_found = True
-                    if line.startswith("## Argument Reference") or line.startswith("## Arguments Reference") or line.startswith("## Configuration Reference") or "the following arguments:" in line or "provide the following credentials:" in line:
-                        section = "arguments"
-                    elif line.startswith("#"):
-                        section = ""
-                    elif section == "arguments" and first_argument_found:
-                        arguments.append(line)
-            
+            arguments = read_provider_arguments(index_path)
+
             # try provider reference (eg. google)
             if len(arguments) == 0:
                 try:
-                    with open(provider_reference_path, 'r') as f:
-                        section = ""
-                        first_argument_found = False
-                        arguments = []
-                        index_file_contents = f.read()
-                        lines = index_file_contents.split("\n")
-                        for line in lines:
-                            if (line.startswith("*") or line.startswith("-")) and section == "arguments":
-                                first_argument_found = True
-                            if line.startswith("## Argument Reference") or line.startswith("## Arguments Reference") or line.startswith("## Configuration Reference") or "the following arguments:" in line or "provide the following credentials:" in line:
-                                section = "arguments"
-                            elif line.startswith("#"):
-                                section = ""
-                            elif section == "arguments" and first_argument_found and not "navigation to the left" in line:
-                                if line.startswith("-"):
-                                    line[0] = "*"
-                                arguments.append(line)
-                except:
+                    arguments = read_provider_arguments(provider_reference_path)
+                except OSError:
                     pass
-            
 
             provider_readme.write("# Aviatrix Provider\n\n")
             
@@ -757,29 +1582,14 @@ def generate_docs(tempdir, provider_type, tfschema, provider_data):
             # iterate provider resources
             provider_readme.write("## Supported Resources\n\n")
             provider_readme_items = []
-            files = [f for f in os.listdir(resources_path) if os.path.isfile(os.path.join(resources_path, f))]
-            for filename in files:
-                with open(os.path.join(resources_path, filename), 'r') as f:
-                    #print(filename)
-                    resource_file_contents = f.read()
-                    resource_properties = process_resource_docs(provider_type, resource_file_contents, provider_readme_items, provider_data)
-                    if resource_properties:
-                        ret[resource_properties['resource_type']] = resource_properties
+            ret = doc_resources if doc_resources is not None else parse_resource_docs(tempdir, provider_type, provider_data)
             
             # provider index
             for k,v in tfschema['provider_schemas']["registry.terraform.io/{}".format(provider_data["data"][0]["attributes"]["full-name"].lower())]['resource_schemas'].items():
                 split_provider_name = k.split("_")
                 split_provider_name.pop(0)
 
-                endnaming = tf_to_cfn_str(k)
-                if k.startswith(provider_type + "_"):
-                    endnaming = tf_to_cfn_str(k[(len(provider_type)+1):])
-
-                prefix = "TF"
-                if len(sys.argv) > 2:
-                    prefix = sys.argv[2]
-                
-                cfn_type = prefix + "::" + provider_avx + "::" + endnaming
+                cfn_type = cfn_type_names(k, provider_type)[0]
                 
                 provider_readme_items.append("* [{cfn_type}](../resources/{provider_name}/{type_stub}/docs/README.md)".format(
                     cfn_type=cfn_type,
@@ -807,15 +1617,7 @@ def generate_docs(tempdir, provider_type, tfschema, provider_data):
                 split_provider_name = k.split("_")
                 split_provider_name.pop(0)
 
-                endnaming = tf_to_cfn_str(k)
-                if k.startswith(provider_type + "_"):
-                    endnaming = tf_to_cfn_str(k[(len(provider_type)+1):])
-
-                prefix = "TF"
-                if len(sys.argv) > 2:
-                    prefix = sys.argv[2]
-                
-                cfn_type = prefix + "::" + provider_avx + "::" + endnaming
+                cfn_type = cfn_type_names(k, provider_type)[0]
                 
                 provider_readme_items.append("* [{cfn_type}](../resources/{provider_name}/{type_stub}/docs/README.md)".format(
                     cfn_type=cfn_type,
@@ -832,7 +1634,24 @@ def generate_docs(tempdir, provider_type, tfschema, provider_data):
 
 
 def main():
-    process_provider("aviatrix")
+    parser = argparse.ArgumentParser(description="Generates CloudFormation resource types from the Aviatrix Terraform provider.")
+    parser.add_argument("provider", nargs="?", default="aviatrix", help="the Terraform provider to generate resource types for")
+    parser.add_argument("prefix", nargs="?", default="TF", help="the prefix of the generated type names (default: TF)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="the number of resource types to generate in parallel (default: 1)")
+    parser.add_argument("-f", "--force", action="store_true", help="regenerate all resource types, even those whose schema and docs are unchanged")
+    parser.add_argument("--cache-dir", default=None, help="the directory caching provider schemas and docs (default: ~/.cache/aviatrix-cfn-types)")
+    parser.add_argument("--cache-keep", type=int, default=3, help="the number of provider versions kept in the cache (default: 3)")
+    parser.add_argument("--offline", action="store_true", help="use the cached provider schema and docs without accessing the network")
+    parser.add_argument("--batch-generate", action="store_true", help="run cfn generate for all resource types in long-lived workers instead of once per type")
+    parser.add_argument("--compress-state", action="store_true", help="store state, status and index objects gzip-compressed (existing uncompressed objects stay readable)")
+    parser.add_argument("--coalesce-window", type=int, default=0, metavar="SECONDS", help="queue handler operations and apply those arriving within this window in one executor run (requires an executor supporting BATCH, default: off)")
+    args = parser.parse_args()
+
+    set_type_prefix(args.prefix)
+    try:
+        process_provider(args.provider, jobs=args.jobs, force=args.force, cache_dir=args.cache_dir, offline=args.offline, cache_keep=args.cache_keep, batch=args.batch_generate, coalesce_window=args.coalesce_window, compress_state=args.compress_state)
+    except KeyboardInterrupt:
+        quit()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,678 @@
+"""
+Runtime shared by the handlers of all generated resource types. generate.py copies this module into every handler
+package next to handlers.py and a type_config.json describing the Terraform type, so that the handlers themselves only
+wire the CloudFormation actions to a ResourceType.
+"""
+import gzip
+import logging
+import json
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from botocore.exceptions import ClientError
+
+from cloudformation_cli_python_lib import (
+    Action,
+    HandlerErrorCode,
+    OperationStatus,
+    ProgressEvent,
+)
+
+# Use this logger to forward log messages to CloudWatch Logs.
+LOG = logging.getLogger(__name__)
+
+EXECUTOR_FUNCTION_NAME = "cfntf-executor"
+CONFIG_FILENAME = "type_config.json"
+
+# Clients and state bucket names are kept across invocations of a warm container, keyed by the credentials they were
+# created with, so that progress polls don't pay for an STS call and new clients every time
+CLIENT_CACHE_SIZE = 16
+client_cache = OrderedDict()
+bucket_name_cache = OrderedDict()
+
+# LIST returns one page of state objects per invocation and fetches their models with a bounded number of threads
+LIST_PAGE_SIZE = 100
+LIST_FETCH_WORKERS = 8
+
+# All models of the type are also kept in a single index object, so that LIST costs a single GET. The index is only
+# trusted once it is complete. Until then LIST serves its pages from the state objects and merges every page into the
+# index, so that a full LIST walk rebuilds it one page per invocation; the index records the last state object key
+# merged so far. It is updated with conditional writes that are retried on conflicts with parallel stacks.
+MODEL_SUFFIX = ".model.json"
+INDEX_RETRIES = 5
+INDEX_BACKOFF_SECONDS = 0.05
+INDEX_CONFLICT_CODES = ('PreconditionFailed', 'ConditionalRequestConflict', 'NoSuchKey')
+
+# With coalescing, operations are queued under queue/<provider>/<window>/ and the first operation of each window invokes
+# the executor once for the whole window, which it processes once the window has closed. Operations are put into the
+# next window when the current one closes within the grace period, so that they are queued before it is processed.
+QUEUE_PREFIX = "queue"
+COALESCE_GRACE_SECONDS = 2
+# The leader retries a failed invoke before it gives up and deletes its leader object. The other operations of the
+# window keep the window in their callback context and claim it once it has closed without a leader.
+INVOKE_RETRIES = 3
+INVOKE_BACKOFF_SECONDS = 0.5
+QUEUE_CONTEXT_KEYS = ('queuePrefix', 'notBefore', 'reclaimed')
+
+# A status lookup that fails this many polls in a row fails the operation, a missing status means it is still running
+STATUS_ERROR_LIMIT = 3
+
+# State, status and index objects may be stored gzip-compressed, they are recognized by their magic bytes so that
+# objects written before compression was enabled can still be read
+GZIP_MAGIC = b'\x1f\x8b'
+GZIP_LEVEL = 6
+
+# Progress is first polled when the operation is expected to be done, then with an exponential backoff
+POLL_MIN_SECONDS = 5
+POLL_MAX_SECONDS = 60
+# the first poll of a slow operation comes early, as updates of slow resource types are often quick
+POLL_PROBE_SECONDS = 20
+
+
+def credentials_key(session):
+    boto_session = getattr(session, 'session', None)
+    if boto_session is None:
+        return None
+    credentials = boto_session.get_credentials()
+    if credentials is None:
+        return None
+    frozen = credentials.get_frozen_credentials()
+    return (frozen.access_key, frozen.secret_key, frozen.token, boto_session.region_name)
+
+
+def cache_get(cache, key, create):
+    if key is None:
+        return create()
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = create()
+    cache[key] = value
+    if len(cache) > CLIENT_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+def get_client(session, service):
+    key = credentials_key(session)
+    return cache_get(client_cache, key and key + (service,), lambda: session.client(service))
+
+
+def get_state_bucket_name(session, request=None):
+    # CloudFormation passes the account in the request, STS is only asked when it doesn't
+    account_id = getattr(request, 'awsAccountId', None)
+    if account_id:
+        return "cfntf-{}-{}".format(os.environ['AWS_REGION'], account_id)
+
+    def resolve():
+        callerid = get_client(session, 'sts').get_caller_identity()
+        return "cfntf-{}-{}".format(os.environ['AWS_REGION'], callerid.get('Account'))
+
+    return cache_get(bucket_name_cache, credentials_key(session), resolve)
+
+
+def put_object_conditional(s3client, etag, **kwargs):
+    # the precondition is sent as a raw header, as the boto3 bundled with the Lambda runtime predates the IfMatch and
+    # IfNoneMatch parameters of PutObject
+    header = ('If-Match', etag) if etag else ('If-None-Match', '*')
+
+    def add_precondition(request, **kwargs):
+        request.headers[header[0]] = header[1]
+
+    s3client.meta.events.register('before-sign.s3.PutObject', add_precondition)
+    try:
+        return s3client.put_object(**kwargs)
+    finally:
+        s3client.meta.events.unregister('before-sign.s3.PutObject', add_precondition)
+
+
+def fetch_object(s3client, statebucketname, key):
+    s3object = s3client.get_object(Bucket=statebucketname, Key=key)
+    return s3object['Body'].read(), s3object['ETag']
+
+
+def decode_json_object(body):
+    if body[:2] == GZIP_MAGIC:
+        body = gzip.decompress(body)
+    return json.loads(body) if body else {}
+
+
+def load_json_object(s3client, statebucketname, key):
+    return decode_json_object(fetch_object(s3client, statebucketname, key)[0])
+
+
+def encode_json_object(value, compress):
+    body = json.dumps(value, separators=(',', ':')).encode()
+    if compress:
+        return {'Body': gzip.compress(body, GZIP_LEVEL), 'ContentType': 'application/json', 'ContentEncoding': 'gzip'}
+    return {'Body': body, 'ContentType': 'application/json'}
+
+
+def schedule_poll(progress, expected_duration, trackingid, operationid, callback_context=None):
+    callback_context = callback_context or {}
+    started = callback_context.get('started', time.time())
+    attempt = callback_context.get('attempt', 0)
+
+    remaining = expected_duration - (time.time() - started)
+    limit = POLL_MAX_SECONDS
+    if remaining >= POLL_MIN_SECONDS:
+        delay = remaining
+        if 'started' not in callback_context:
+            # a queued operation can't be done before its window has closed, so its probe counts from then, even when
+            # that is further away than the longest poll interval
+            opens = max(callback_context.get('notBefore', 0) - time.time(), 0)
+            delay = min(remaining, opens + POLL_PROBE_SECONDS)
+            limit = max(POLL_MAX_SECONDS, opens + POLL_PROBE_SECONDS)
+    else:
+        # attempt counts the polls made once the operation is overdue
+        delay = POLL_MIN_SECONDS * 2 ** attempt
+        attempt += 1
+
+    progress.callbackDelaySeconds = int(min(max(delay, POLL_MIN_SECONDS), limit))
+    progress.callbackContext = {
+        'trackingid': trackingid,
+        'operationid': operationid,
+        'started': started,
+        'attempt': attempt,
+    }
+    progress.callbackContext.update({k: callback_context[k] for k in QUEUE_CONTEXT_KEYS if k in callback_context})
+
+
+class ResourceType:
+    """
+    Implements the CloudFormation handlers of a Terraform resource type on top of the executor Lambda function and the
+    state bucket.
+
+    Args:
+        model_class (type): The generated ResourceModel class of the type.
+        config (dict): The type configuration written by generate.py.
+    """
+
+    def __init__(self, model_class, config):
+        self.model_class = model_class
+        self.terraform_type_name = config['terraformTypeName']
+        self.coalesce_window = config.get('coalesceWindowSeconds', 0)
+        self.compress_state = config.get('compressState', False)
+        # queued operations wait for their window to close before the executor starts them
+        self.expected_duration = config['expectedDuration'] + self.coalesce_window
+
+        # static data is prepared once per container instead of on every invocation
+        self.property_defaults = dict.fromkeys(config['properties'])
+        self.payload_defaults = {
+            'providerFullName': config['providerFullName'],
+            'providerTypeName': config['providerTypeName'],
+            'terraformTypeName': config['terraformTypeName'],
+            'returnValues': config['returnValues'],
+            'compressState': self.compress_state,
+        }
+
+        self.state_prefix = "state/{}/".format(self.terraform_type_name)
+        self.queue_prefix = "{}/{}/".format(QUEUE_PREFIX, config['providerTypeName'])
+        self.index_key = "index/{}.json".format(self.terraform_type_name)
+
+    @classmethod
+    def from_package(cls, model_class, package_dir):
+        """
+        Creates the resource type from the type configuration stored in a handler package.
+
+        Args:
+            model_class (type): The generated ResourceModel class of the type.
+            package_dir (str): The directory of the handler package.
+
+        Returns:
+            ResourceType: The resource type.
+        """
+        with open(os.path.join(package_dir, CONFIG_FILENAME), "r") as f:
+            return cls(model_class, json.load(f))
+
+    # state objects
+
+    def model_from_state(self, tfcfnid, model_state):
+        model = self.model_class(tfcfnid=tfcfnid, **self.property_defaults)
+
+        for k,v in model_state.items():
+            setattr(model, k, v)
+
+        return model
+
+    def state_key(self, tfcfnid):
+        return "{}{}{}".format(self.state_prefix, tfcfnid, MODEL_SUFFIX)
+
+    def load_model_state(self, s3client, statebucketname, tfcfnid):
+        return load_json_object(s3client, statebucketname, self.state_key(tfcfnid))
+
+    def model_state_etag(self, s3client, statebucketname, tfcfnid):
+        try:
+            return s3client.head_object(Bucket=statebucketname, Key=self.state_key(tfcfnid))['ETag']
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def load_model_states(self, s3client, statebucketname, tfcfnids):
+        if not tfcfnids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(LIST_FETCH_WORKERS, len(tfcfnids))) as executor:
+            return list(executor.map(lambda tfcfnid: self.load_model_state(s3client, statebucketname, tfcfnid), tfcfnids))
+
+    def list_state_page(self, s3client, statebucketname, start_after=None, page_size=LIST_PAGE_SIZE):
+        list_args = {
+            'Bucket': statebucketname,
+            'MaxKeys': page_size,
+            'Prefix': self.state_prefix
+        }
+        if start_after:
+            list_args['StartAfter'] = self.state_prefix + start_after
+        state_objects = s3client.list_objects_v2(**list_args)
+
+        keys = [state_object['Key'][len(self.state_prefix):] for state_object in state_objects.get('Contents', [])]
+        next_token = keys[-1] if keys and state_objects.get('IsTruncated') else None
+        tfcfnids = [key[:-len(MODEL_SUFFIX)] for key in keys if key.endswith(MODEL_SUFFIX)]
+
+        return tfcfnids, next_token
+
+    # model index
+
+    def read_index(self, s3client, statebucketname):
+        try:
+            body, etag = fetch_object(s3client, statebucketname, self.index_key)
+        except s3client.exceptions.NoSuchKey:
+            return None, None
+
+        return decode_json_object(body), etag
+
+    def update_index(self, s3client, statebucketname, update):
+        try:
+            for attempt in range(INDEX_RETRIES):
+                if attempt:
+                    time.sleep(random.uniform(0, INDEX_BACKOFF_SECONDS * 2 ** attempt))
+
+                index, etag = self.read_index(s3client, statebucketname)
+                if index is None:
+                    index = {'complete': False, 'models': {}, 'removed': []}
+                update(index)
+
+                try:
+                    put_object_conditional(s3client, etag, Bucket=statebucketname, Key=self.index_key, **encode_json_object(index, self.compress_state))
+                    return index
+                except ClientError as e:
+                    if e.response['Error']['Code'] not in INDEX_CONFLICT_CODES:
+                        raise
+            LOG.warn("Gave up updating the model index after {} conflicts".format(INDEX_RETRIES))
+        except Exception as e:
+            LOG.warn("Could not update the model index: {}".format(str(e)))
+
+        # an index that missed an update can't be trusted anymore, the next LIST rebuilds it
+        try:
+            s3client.delete_object(Bucket=statebucketname, Key=self.index_key)
+        except Exception as e:
+            LOG.warn(str(e))
+        return None
+
+    def index_upsert(self, s3client, statebucketname, tfcfnid, model_state):
+        def update(index):
+            index['models'][tfcfnid] = model_state
+            if tfcfnid in index['removed']:
+                index['removed'].remove(tfcfnid)
+
+        self.update_index(s3client, statebucketname, update)
+
+    def index_remove(self, s3client, statebucketname, tfcfnid):
+        def update(index):
+            index['models'].pop(tfcfnid, None)
+            if not index['complete'] and tfcfnid not in index['removed']:
+                index['removed'].append(tfcfnid)
+
+        self.update_index(s3client, statebucketname, update)
+
+    def extends_index(self, index, start_after):
+        # a page extends the index if it leaves no gap after the keys merged so far
+        if index is None:
+            return start_after is None
+        cursor = index.get('cursor')
+        return not index['complete'] and (start_after is None or (cursor is not None and start_after <= cursor))
+
+    def merge_index_page(self, s3client, statebucketname, start_after, scanned, next_token):
+        # entries written since the state objects were scanned are newer than the scanned ones
+        def update(index):
+            if not self.extends_index(index, start_after):
+                return
+            for tfcfnid, model_state in scanned.items():
+                if tfcfnid not in index['models'] and tfcfnid not in index['removed']:
+                    index['models'][tfcfnid] = model_state
+            if next_token is None:
+                index['complete'] = True
+                index['removed'] = []
+                index.pop('cursor', None)
+            elif index.get('cursor') is None or next_token > index['cursor']:
+                index['cursor'] = next_token
+
+        return self.update_index(s3client, statebucketname, update)
+
+    # operations
+
+    def find_status(self, s3client, statebucketname, operationid):
+        # the executor writes the status object when the operation is done, until then it is missing
+        try:
+            return load_json_object(s3client, statebucketname, "status/{}.json".format(operationid))
+        except s3client.exceptions.NoSuchKey:
+            return None
+
+    def check_progress(self, callback_context, progress, session, request, action):
+        operationid = callback_context.get('operationid')
+        trackingid = callback_context.get('trackingid')
+        LOG.warn("Retrieving existing operation status ({})".format(operationid))
+
+        s3client = get_client(session, 's3')
+        statebucketname = get_state_bucket_name(session, request)
+
+        try:
+            result = self.find_status(s3client, statebucketname, operationid)
+            if result is None and self.reclaim_window(session, s3client, statebucketname, callback_context):
+                callback_context = dict(callback_context, reclaimed=True)
+        except Exception as e:
+            # errors are retried on the next poll, unless they keep occurring
+            errors = callback_context.get('errors', 0) + 1
+            LOG.warn("Could not retrieve the operation status (attempt {}): {}".format(errors, str(e)))
+            if errors >= STATUS_ERROR_LIMIT:
+                progress.status = OperationStatus.FAILED
+                progress.message = str(e)
+                progress.errorCode = HandlerErrorCode.InternalFailure
+                return progress
+            schedule_poll(progress, self.expected_duration, trackingid, operationid, callback_context)
+            progress.callbackContext['errors'] = errors
+            return progress
+
+        if result is None:
+            schedule_poll(progress, self.expected_duration, trackingid, operationid, callback_context)
+            return progress
+
+        try:
+            s3client.delete_object(Bucket=statebucketname, Key="status/{}.json".format(operationid))
+        except Exception as e:
+            LOG.warn(str(e))
+
+        if result.get('status') == 'completed':
+            progress.status = OperationStatus.SUCCESS
+
+            if action == Action.DELETE:
+                self.index_remove(s3client, statebucketname, trackingid)
+            else:
+                # retrieve model
+                try:
+                    model_state = self.load_model_state(s3client, statebucketname, trackingid)
+
+                    for k,v in model_state.items():
+                        setattr(progress.resourceModel, k, v)
+
+                    self.index_upsert(s3client, statebucketname, trackingid, model_state)
+                except Exception as e:
+                    LOG.warn(str(e))
+
+            LOG.warn("Action complete")
+        else:
+            progress.status = OperationStatus.FAILED
+            if 'error' in result:
+                progress.message = result['error']
+                progress.errorCode = HandlerErrorCode.GeneralServiceException
+
+        return progress
+
+    def start_operation(self, session, request, progress, action, trackingid, stateetag=None):
+        model = request.desiredResourceState
+        lambdaclient = get_client(session, "lambda")
+
+        try:
+            operationid = str(uuid4())
+
+            resolved_model = None
+            if model: # potentially no properties set
+                resolved_model = model._serialize()
+
+            payload = {
+                'action': action,
+                'trackingId': trackingid,
+                'operationId': operationid,
+                'model': resolved_model,
+                'logicalId': request.logicalResourceIdentifier,
+                **self.payload_defaults,
+            }
+            if stateetag:
+                payload['stateETag'] = stateetag
+
+            window = None
+            if self.coalesce_window:
+                window = self.enqueue_operation(session, request, lambdaclient, payload)
+            else:
+                lambdaclient.invoke(
+                    FunctionName=EXECUTOR_FUNCTION_NAME,
+                    InvocationType="Event",
+                    Payload=json.dumps(payload).encode(),
+                )
+
+            progress.resourceModel.tfcfnid = trackingid
+            schedule_poll(progress, self.expected_duration, trackingid, operationid, window)
+        except lambdaclient.exceptions.ResourceNotFoundException as e:
+            progress.message = "The execution infrastructure is not available."
+            progress.status = OperationStatus.FAILED
+            progress.errorCode = HandlerErrorCode.GeneralServiceException
+        except Exception as e:
+            progress.message = str(e)
+            progress.status = OperationStatus.FAILED
+            progress.errorCode = HandlerErrorCode.InternalFailure
+        return progress
+
+    def enqueue_operation(self, session, request, lambdaclient, payload):
+        s3client = get_client(session, 's3')
+        statebucketname = get_state_bucket_name(session, request)
+
+        window = int((time.time() + COALESCE_GRACE_SECONDS) // self.coalesce_window)
+        window_prefix = "{}{}/".format(self.queue_prefix, window)
+        entry_key = "{}{}.json".format(window_prefix, payload['operationId'])
+        s3client.put_object(Bucket=statebucketname, Key=entry_key, Body=json.dumps(payload).encode(), ContentType='application/json')
+
+        # only the operation that creates the leader object of the window invokes the executor
+        window_context = {
+            'queuePrefix': window_prefix,
+            'notBefore': (window + 1) * self.coalesce_window + COALESCE_GRACE_SECONDS,
+        }
+        try:
+            try:
+                put_object_conditional(s3client, None, Bucket=statebucketname, Key=window_prefix + "leader", Body=payload['operationId'].encode())
+            except ClientError as e:
+                if e.response['Error']['Code'] in INDEX_CONFLICT_CODES:
+                    return window_context
+                raise
+
+            self.invoke_batch(lambdaclient, window_prefix, window_context['notBefore'])
+        except Exception:
+            # this operation fails, so the executor must not run it when another operation leads or claims the window
+            self.release_leader(s3client, statebucketname, window_prefix, payload['operationId'])
+            try:
+                s3client.delete_object(Bucket=statebucketname, Key=entry_key)
+            except Exception as e:
+                LOG.warn("Could not remove the queued operation {}: {}".format(entry_key, str(e)))
+            raise
+
+        return window_context
+
+    def release_leader(self, s3client, statebucketname, window_prefix, operationid):
+        # the leader object is only deleted if this operation created it, which a failed PUT may still have done, so
+        # that a later operation of the window can claim it
+        try:
+            leader = s3client.get_object(Bucket=statebucketname, Key=window_prefix + "leader")['Body'].read()
+            if leader.decode() == operationid:
+                s3client.delete_object(Bucket=statebucketname, Key=window_prefix + "leader")
+        except s3client.exceptions.NoSuchKey:
+            pass
+        except Exception as e:
+            LOG.warn("Could not release the leader object of {}: {}".format(window_prefix, str(e)))
+
+    def invoke_batch(self, lambdaclient, window_prefix, not_before):
+        payload = json.dumps({
+            'action': 'BATCH',
+            'queuePrefix': window_prefix,
+            'notBefore': not_before,
+            'providerFullName': self.payload_defaults['providerFullName'],
+            'providerTypeName': self.payload_defaults['providerTypeName'],
+        }).encode()
+
+        for attempt in range(INVOKE_RETRIES):
+            try:
+                lambdaclient.invoke(FunctionName=EXECUTOR_FUNCTION_NAME, InvocationType="Event", Payload=payload)
+                return
+            except lambdaclient.exceptions.ResourceNotFoundException:
+                raise
+            except Exception as e:
+                if attempt + 1 == INVOKE_RETRIES:
+                    raise
+                LOG.warn("Could not invoke the executor (attempt {}): {}".format(attempt + 1, str(e)))
+                time.sleep(random.uniform(0.5, 1.5) * INVOKE_BACKOFF_SECONDS * 2 ** attempt)
+
+    def reclaim_window(self, session, s3client, statebucketname, callback_context):
+        # a window that has closed without a leader object was abandoned by a leader that could not invoke the executor,
+        # so the queued operations still waiting for their status start the executor run themselves, at most once each
+        window_prefix = callback_context.get('queuePrefix')
+        if not window_prefix or callback_context.get('reclaimed') or time.time() < callback_context['notBefore']:
+            return False
+
+        try:
+            try:
+                put_object_conditional(s3client, None, Bucket=statebucketname, Key=window_prefix + "leader", Body=callback_context['operationid'].encode())
+            except ClientError as e:
+                if e.response['Error']['Code'] in INDEX_CONFLICT_CODES:
+                    return True
+                raise
+
+            LOG.warn("Starting the executor run of the abandoned window {}".format(window_prefix))
+            self.invoke_batch(get_client(session, "lambda"), window_prefix, callback_context['notBefore'])
+        except Exception:
+            self.release_leader(s3client, statebucketname, window_prefix, callback_context['operationid'])
+            raise
+        return True
+
+    def start_existing_operation(self, session, request, progress, action):
+        model = request.desiredResourceState
+        s3client = get_client(session, 's3')
+        statebucketname = get_state_bucket_name(session, request)
+
+        # the state object is only checked for existence, its ETag lets the executor detect concurrent modifications
+        try:
+            stateetag = self.model_state_etag(s3client, statebucketname, model.tfcfnid)
+        except Exception as e:
+            progress.message = str(e)
+            progress.status = OperationStatus.FAILED
+            progress.errorCode = HandlerErrorCode.InternalFailure
+            return progress
+
+        if stateetag is None:
+            progress.message = "No state found for {}".format(model.tfcfnid)
+            progress.status = OperationStatus.FAILED
+            progress.errorCode = HandlerErrorCode.NotFound
+            return progress
+
+        return self.start_operation(session, request, progress, action, model.tfcfnid, stateetag)
+
+    # handlers
+
+    def create(self, session, request, callback_context):
+        progress = ProgressEvent(
+            status=OperationStatus.IN_PROGRESS,
+            resourceModel=request.desiredResourceState,
+        )
+
+        if callback_context.get('operationid'):
+            return self.check_progress(callback_context, progress, session, request, Action.CREATE)
+
+        LOG.warn("Starting create action")
+        return self.start_operation(session, request, progress, 'CREATE', str(uuid4()))
+
+    def update(self, session, request, callback_context):
+        progress = ProgressEvent(
+            status=OperationStatus.IN_PROGRESS,
+            resourceModel=request.desiredResourceState,
+        )
+
+        if callback_context.get('operationid'):
+            return self.check_progress(callback_context, progress, session, request, Action.UPDATE)
+
+        LOG.warn("Starting update action")
+        return self.start_existing_operation(session, request, progress, 'UPDATE')
+
+    def delete(self, session, request, callback_context):
+        progress = ProgressEvent(
+            status=OperationStatus.IN_PROGRESS,
+            resourceModel=request.desiredResourceState,
+        )
+
+        if callback_context.get('operationid'):
+            ret = self.check_progress(callback_context, progress, session, request, Action.DELETE)
+            ret.resourceModel = None
+            return ret
+
+        LOG.warn("Starting delete action")
+        return self.start_existing_operation(session, request, progress, 'DELETE')
+
+    def read(self, session, request, callback_context):
+        model = request.desiredResourceState
+
+        s3client = get_client(session, 's3')
+        statebucketname = get_state_bucket_name(session, request)
+
+        # retrieve model
+        try:
+            model_state = self.load_model_state(s3client, statebucketname, model.tfcfnid)
+
+            for k,v in model_state.items():
+                setattr(model, k, v)
+
+            return ProgressEvent(
+                status=OperationStatus.SUCCESS,
+                resourceModel=model,
+            )
+        except Exception as e:
+            LOG.warn(str(e))
+
+        return ProgressEvent(
+            status=OperationStatus.FAILED,
+            errorCode=HandlerErrorCode.NotFound,
+            resourceModel=model,
+        )
+
+    def list(self, session, request, callback_context):
+        s3client = get_client(session, 's3')
+        statebucketname = get_state_bucket_name(session, request)
+
+        # retrieve one page of models, CloudFormation passes the token back to fetch the next one
+        try:
+            index, _ = self.read_index(s3client, statebucketname)
+            if index and index['complete']:
+                # tokens are state object keys, so that pages from the index and from the state objects line up
+                tfcfnids = [tfcfnid for tfcfnid in sorted(index['models'], key=lambda tfcfnid: tfcfnid + MODEL_SUFFIX) if not request.nextToken or tfcfnid + MODEL_SUFFIX > request.nextToken]
+                models = [self.model_from_state(tfcfnid, index['models'][tfcfnid]) for tfcfnid in tfcfnids[:LIST_PAGE_SIZE]]
+                next_token = tfcfnids[LIST_PAGE_SIZE - 1] + MODEL_SUFFIX if len(tfcfnids) > LIST_PAGE_SIZE else None
+            else:
+                tfcfnids, next_token = self.list_state_page(s3client, statebucketname, request.nextToken)
+                scanned = dict(zip(tfcfnids, self.load_model_states(s3client, statebucketname, tfcfnids)))
+                models = [self.model_from_state(tfcfnid, model_state) for tfcfnid, model_state in scanned.items()]
+
+                if self.extends_index(index, request.nextToken):
+                    self.merge_index_page(s3client, statebucketname, request.nextToken, scanned, next_token)
+
+            return ProgressEvent(
+                status=OperationStatus.SUCCESS,
+                resourceModels=models,
+                nextToken=next_token,
+            )
+        except Exception as e:
+            LOG.warn(str(e))
+
+        return ProgressEvent(
+            status=OperationStatus.FAILED,
+            errorCode=HandlerErrorCode.InternalFailure,
+            resourceModels=[],
+        )
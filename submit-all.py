@@ -1,27 +1,315 @@
+"""
+Submits the generated resource types to CloudFormation in one or more regions.
+
+Registrations run concurrently, throttled registrations are retried with a backoff, and the progress of every type and
+region is recorded in resources/<provider>/.submit-state.json, so that an interrupted run can be resumed: types that
+were registered are skipped, and registrations that were still in progress are waited for instead of submitted again.
+Types whose schema and handler package are unchanged since they were last submitted (see submit.py) are skipped too.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import re
+import shutil
 import subprocess
+import threading
+import time
 from pathlib import Path
 
-# Set the path to the aviatrix resources directory
-aviatrix_resources_dir = Path("resources/aviatrix")
+import boto3
+from botocore.config import Config
+
+import submit
+
+STATE_FILENAME = ".submit-state.json"
+
+# cfn submit logs the registration token before it waits for the registration to complete
+TOKEN_PATTERN = re.compile(r"registration with token '([^']+)'")
+THROTTLING_PATTERN = re.compile(r"Throttling|Rate exceeded|TooManyRequests|RequestLimitExceeded")
+# every cfn submit creates or updates the CloudFormationManagedUploadInfrastructure stack of its region, which fails
+# while another submission is creating or updating it
+INFRA_CONFLICT_PATTERN = re.compile(r"AlreadyExists|[A-Z_]+_IN_PROGRESS state")
+BACKOFF_SECONDS = 10
+
+BOTO_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 10})
+
+
+class SubmitState:
+    """
+    The submission progress of every resource type and region, saved after every change.
+
+    Args:
+        path (Path): The state file.
+        restart (bool): If true, the progress of a previous run is discarded.
+    """
+
+    def __init__(self, path, restart=False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if not restart and path.exists():
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(type_name, region):
+        return "{}|{}".format(type_name, region)
+
+    def get(self, type_name, region):
+        with self.lock:
+            return dict(self.entries.get(self.key(type_name, region), {}))
+
+    def update(self, type_name, region, **values):
+        with self.lock:
+            entry = self.entries.setdefault(self.key(type_name, region), {})
+            entry.update(values, updated=time.time())
+
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class SubmitManifest:
+    """
+    The submit manifest shared by the submitting threads.
+
+    Args:
+        path (Path): The manifest file.
+        cfn_clients (dict): The CloudFormation client of every region, created up front as boto3 sessions aren't
+            thread-safe.
+    """
+
+    def __init__(self, path, cfn_clients):
+        self.path = path
+        self.cfn_clients = cfn_clients
+        self.lock = threading.Lock()
+        self.manifest = submit.load_manifest(path)
+
+    def is_unchanged(self, type_name, region, content_hash):
+        with self.lock:
+            manifest = dict(self.manifest)
+        try:
+            return submit.is_unchanged(manifest, self.cfn_clients[region], type_name, region, content_hash)
+        except Exception as e:
+            print("Could not look up the registered version of {} in {}: {}".format(type_name, region, e))
+            return False
+
+    def record(self, type_name, region, content_hash):
+        record = {}
+        try:
+            submit.record_submission(record, self.cfn_clients[region], type_name, region, content_hash)
+        except Exception as e:
+            print("Could not look up the registered version of {} in {}: {}".format(type_name, region, e))
+            return
+        with self.lock:
+            self.manifest.update(record)
+            submit.save_manifest(self.path, self.manifest)
+
+
+def resume_registration(cfn_client, type_name, region, token):
+    """
+    Waits for a registration started by an interrupted run and makes the registered version the default.
+
+    Args:
+        cfn_client: The CloudFormation client of the region.
+        type_name (str): The resource type name.
+        region (str): The region of the registration.
+        token (str): The registration token.
+
+    Returns:
+        bool: True if the registration completed, False if it failed and the type has to be submitted again.
+    """
+    registration = cfn_client.describe_type_registration(RegistrationToken=token)
+    if registration['ProgressStatus'] == 'IN_PROGRESS':
+        print("Waiting for the registration of {} in {} started by a previous run".format(type_name, region))
+        try:
+            cfn_client.get_waiter("type_registration_complete").wait(RegistrationToken=token)
+        except Exception:
+            pass
+        registration = cfn_client.describe_type_registration(RegistrationToken=token)
+
+    if registration['ProgressStatus'] != 'COMPLETE':
+        return False
+
+    cfn_client.set_type_default_version(Arn=registration['TypeVersionArn'])
+    return True
+
+
+def run_submit(resource_dir, region, cache_dir, on_token):
+    """
+    Runs `cfn submit --set-default` for a resource type, reporting the registration token as soon as it is logged.
+
+    Args:
+        resource_dir (Path): The resource project directory.
+        region (str): The region to register the type in.
+        cache_dir (Path): The root of the dependency cache, or None to build the dependencies of every package.
+        on_token (callable): Called with the registration token.
+
+    Returns:
+        tuple: The return code and the output of the command.
+    """
+    proc = subprocess.Popen(submit.submit_command(region, cache_dir),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        cwd=resource_dir.absolute())
+
+    output = []
+    for line in proc.stdout:
+        line = line.decode("utf-8", errors="replace")
+        output.append(line)
+        match = TOKEN_PATTERN.search(line)
+        if match:
+            on_token(match.group(1))
+    proc.wait()
+
+    return proc.returncode, "".join(output)
+
+
+def submit_type(resource_dir, regions, cfn_clients, state, attempts, manifest, force, cache_dir):
+    """
+    Registers a resource type in every region that it isn't registered in yet. The regions of a type are submitted one
+    after the other, as `cfn submit` builds the package in the project directory.
+
+    Args:
+        resource_dir (Path): The resource project directory.
+        regions (list): The regions to register the type in.
+        cfn_clients (dict): The CloudFormation client of every region.
+        state (SubmitState): The submission progress.
+        attempts (int): The number of attempts per region when the registration is throttled or conflicts with another.
+        manifest (SubmitManifest): The package hashes of the submitted types.
+        force (bool): If true, the type is submitted even if its package is unchanged.
+        cache_dir (Path): The root of the dependency cache, or None to build the dependencies of every package.
+    """
+    type_name = resource_dir.name.replace('-', '::')
+    content_hash = submit.package_hash(resource_dir)
+
+    for region in regions:
+        entry = state.get(type_name, region)
+        if entry.get('status') in ('succeeded', 'unchanged') and entry.get('hash') == content_hash:
+            continue
+
+        if not force and manifest.is_unchanged(type_name, region, content_hash):
+            state.update(type_name, region, status='unchanged', hash=content_hash, error=None)
+            print("Skipping {} in {}, the registered default version is unchanged".format(type_name, region))
+            continue
+
+        start = time.time()
+        if entry.get('status') == 'in_progress' and entry.get('token'):
+            try:
+                if entry.get('hash') == content_hash and resume_registration(cfn_clients[region], type_name, region, entry['token']):
+                    manifest.record(type_name, region, content_hash)
+                    state.update(type_name, region, status='succeeded', error=None, seconds=time.time() - start)
+                    print("Successfully submitted {} in {}".format(type_name, region))
+                    continue
+            except Exception as e:
+                print("Could not resume the registration of {} in {}: {}".format(type_name, region, e))
+
+        for attempt in range(attempts):
+            state.update(type_name, region, status='in_progress', token=None, hash=content_hash, attempts=attempt + 1)
+            returncode, output = run_submit(resource_dir, region, cache_dir, lambda token: state.update(type_name, region, token=token))
+
+            if returncode == 0:
+                manifest.record(type_name, region, content_hash)
+                state.update(type_name, region, status='succeeded', error=None, seconds=time.time() - start)
+                print("Successfully submitted {} in {}".format(type_name, region))
+                break
+
+            error = output.strip().splitlines()[-1] if output.strip() else "cfn submit exited with status {}".format(returncode)
+            retryable = THROTTLING_PATTERN.search(output) or INFRA_CONFLICT_PATTERN.search(output)
+            if retryable and attempt + 1 < attempts:
+                delay = BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5)
+                print("Submitting {} in {} failed with {}, retrying in {:.0f} s".format(type_name, region, retryable.group(0), delay))
+                time.sleep(delay)
+                continue
+
+            state.update(type_name, region, status='failed', error=error, seconds=time.time() - start)
+            print("Failed to submit {} in {}: {}".format(type_name, region, error))
+            break
+
+    shutil.rmtree((resource_dir / "build").absolute(), ignore_errors=True)
+
+
+def print_report(type_names, regions, state):
+    """
+    Prints the submission status of every resource type per region.
+
+    Args:
+        type_names (list): The resource type names.
+        regions (list): The regions.
+        state (SubmitState): The submission progress.
+    """
+    width = max([len(type_name) for type_name in type_names] + [len("type")])
+    print("{}  {}".format("type".ljust(width), "  ".join(region.ljust(12) for region in regions)))
+
+    totals = {}
+    failures = []
+    for type_name in type_names:
+        statuses = []
+        for region in regions:
+            entry = state.get(type_name, region)
+            status = entry.get('status', 'pending')
+            totals[status] = totals.get(status, 0) + 1
+            if status == 'failed':
+                failures.append((type_name, region, entry.get('error')))
+            statuses.append(status.ljust(12))
+        print("{}  {}".format(type_name.ljust(width), "  ".join(statuses)))
+
+    print()
+    print(", ".join("{} {}".format(count, status) for status, count in sorted(totals.items())))
+    for type_name, region, error in failures:
+        print("  {} in {}: {}".format(type_name, region, error))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Submits the generated resource types to CloudFormation.")
+    parser.add_argument("types", nargs="*", help="the resource types to submit, eg. TF::Aviatrix::Account (default: all generated types)")
+    parser.add_argument("--provider", default="aviatrix", help="the provider directory under resources (default: aviatrix)")
+    parser.add_argument("--regions", help="comma-separated regions to submit to (default: the region of the AWS profile)")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="the number of resource types submitted in parallel (default: 4)")
+    parser.add_argument("--attempts", type=int, default=5, help="the number of attempts per type and region when throttled (default: 5)")
+    parser.add_argument("--restart", action="store_true", help="submit everything again instead of resuming the previous run")
+    parser.add_argument("--force", action="store_true", help="submit types even if their schema and handler package are unchanged")
+    parser.add_argument("--cache-dir", type=Path, default=submit.default_cache_dir(), help="the root of the dependency cache (default: %(default)s)")
+    parser.add_argument("--no-dependency-cache", action="store_true", help="build the dependencies of every package from scratch")
+    args = parser.parse_args()
+
+    regions = args.regions.split(",") if args.regions else [boto3.session.Session().region_name]
+    if not all(regions):
+        print("No default region found in AWS configuration and no --regions argument provided.")
+        return
+
+    # List all resource directories in the provider's resources directory
+    resources_dir = Path("resources") / args.provider
+    resource_dirs = sorted(f for f in resources_dir.iterdir() if f.is_dir())
+    if args.types:
+        resource_dirs = [f for f in resource_dirs if f.name.replace('-', '::') in args.types]
+
+    # clients are thread-safe, unlike the default session they would be created from on the submitting threads
+    cfn_clients = {region: boto3.client("cloudformation", region_name=region, config=BOTO_CONFIG) for region in regions}
+
+    state = SubmitState(resources_dir / STATE_FILENAME, args.restart)
+    manifest = SubmitManifest(resources_dir / submit.MANIFEST_FILENAME, cfn_clients)
+    submit_args = (regions, cfn_clients, state, args.attempts, manifest, args.force, None if args.no_dependency_cache else args.cache_dir)
+
+    # the first type is submitted on its own, so that it creates the upload infrastructure stack of every region
+    # before the other submissions update it concurrently
+    if resource_dirs:
+        submit_type(resource_dirs[0], *submit_args)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(submit_type, resource_dir, *submit_args) for resource_dir in resource_dirs[1:]]
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+    print()
+    print_report([resource_dir.name.replace('-', '::') for resource_dir in resource_dirs], regions, state)
+
 
-# Function to run the submit.py script for a given resource
-def submit_resource(resource_dir):
-    # Convert dashes in resource directory names to two colons
-    resource_name = resource_dir.name.replace('-', '::')
+if __name__ == "__main__":
     try:
-        # Run the submit.py script with the modified resource name
-        subprocess.run(['python3', 'submit.py', resource_name], check=True)
-        print(f"Successfully submitted {resource_name}")
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to submit {resource_name}: {e}")
-
-# List all resource directories in the aviatrix resources directory
-resource_dirs = [f for f in aviatrix_resources_dir.iterdir() if f.is_dir()]
-
-# # Limit the number of resources to submit
-# max_resources = 50
-# limited_resource_dirs = resource_dirs[:max_resources]
-
-# Loop through the limited list of resource directories and submit each one
-for resource_dir in resource_dirs:
-    submit_resource(resource_dir)
\ No newline at end of file
+        main()
+    except KeyboardInterrupt:
+        quit()
@@ -1,9 +1,21 @@
+import argparse
+import hashlib
+import json
 import shutil
 import sys
 import subprocess
 import os
 from pathlib import Path
 
+import boto3
+
+from generate import cfn_python, default_cache_dir
+
+MANIFEST_FILENAME = ".submit-manifest.json"
+
+# the files of a resource project that end up in the registered type, besides the schema and the handler package
+PACKAGE_FILES = [".rpdk-config", "requirements.txt", "resource-role.yaml"]
+
 
 def check_call(args, cwd):
     """
@@ -29,15 +41,173 @@ def check_call(args, cwd):
         raise subprocess.CalledProcessError(
             returncode=proc.returncode,
             cmd=args)
-    
+
     return stdout
 
 
-print("Preparing package...")
-resourcedir = Path("resources") / sys.argv[1].split("::")[1].lower() / sys.argv[1].replace("::","-")
+def submit_command(region, cache_dir=None):
+    """
+    Builds the command that submits the resource project in the current directory.
+
+    Args:
+        region (str): The region to register the type in.
+        cache_dir (Path): The root of the dependency cache, or None to build the dependencies of every package.
+
+    Returns:
+        list: The command and its arguments.
+    """
+    cfn_args = ['--set-default', '--region', region]
+    if cache_dir is None:
+        return ['cfn', 'submit'] + cfn_args
+
+    return cfn_python() + [str(Path("cached-submit.py").absolute()), '.', '--cache-dir', str(Path(cache_dir).absolute())] + cfn_args
+
+
+def package_hash(resource_dir):
+    """
+    Computes a content hash over the schema and the handler package of a resource project.
+
+    Args:
+        resource_dir (Path): The resource project directory.
+
+    Returns:
+        str: The hex digest of the hash.
+    """
+    schema_file = resource_dir / (resource_dir.name.lower() + ".json")
+    files = [schema_file] + [resource_dir / name for name in PACKAGE_FILES]
+    files += sorted(f for f in (resource_dir / "src").rglob("*") if f.is_file() and "__pycache__" not in f.parts)
+
+    digest = hashlib.sha256()
+    for f in files:
+        if f.exists():
+            digest.update(f.relative_to(resource_dir).as_posix().encode("utf-8") + b"\0")
+            digest.update(f.read_bytes())
+            digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def registered_version_id(cfn_client, type_name):
+    """
+    Looks up the default version of a registered resource type.
+
+    Args:
+        cfn_client: The CloudFormation client of the region the type is registered in.
+        type_name (str): The resource type name.
+
+    Returns:
+        str: The default version id, or None if the type isn't registered.
+    """
+    try:
+        return cfn_client.describe_type(Type='RESOURCE', TypeName=type_name).get('DefaultVersionId')
+    except cfn_client.exceptions.TypeNotFoundException:
+        return None
+
+
+def load_manifest(manifest_path):
+    """
+    Loads the hashes of the submitted resource types.
+
+    Args:
+        manifest_path (Path): The path to the manifest file.
+
+    Returns:
+        dict: The package hash and registered version per "<type name>|<region>", empty if there is no readable manifest.
+    """
+    try:
+        with open(manifest_path, "r") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest_path, manifest):
+    """
+    Writes the hashes of the submitted resource types.
+
+    Args:
+        manifest_path (Path): The path to the manifest file.
+        manifest (dict): The package hash and registered version per "<type name>|<region>".
+    """
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(json.dumps(manifest, indent=4, sort_keys=True))
+    os.replace(tmp_path, manifest_path)
+
+
+def is_unchanged(manifest, cfn_client, type_name, region, content_hash):
+    """
+    Checks whether a resource type was submitted with the same package hash and its submitted version is still the
+    default version of the type.
+
+    Args:
+        manifest (dict): The submit manifest.
+        cfn_client: The CloudFormation client of the region.
+        type_name (str): The resource type name.
+        region (str): The region to check.
+        content_hash (str): The package hash of the resource project.
+
+    Returns:
+        bool: True if the type does not need to be submitted again.
+    """
+    record = manifest.get("{}|{}".format(type_name, region))
+    if not record or record.get('hash') != content_hash:
+        return False
+
+    return registered_version_id(cfn_client, type_name) == record.get('versionId')
+
+
+def record_submission(manifest, cfn_client, type_name, region, content_hash):
+    """
+    Records the package hash and the new default version of a submitted resource type in the manifest.
+
+    Args:
+        manifest (dict): The submit manifest.
+        cfn_client: The CloudFormation client of the region.
+        type_name (str): The resource type name.
+        region (str): The region the type was submitted to.
+        content_hash (str): The package hash of the resource project.
+    """
+    manifest["{}|{}".format(type_name, region)] = {
+        'hash': content_hash,
+        'versionId': registered_version_id(cfn_client, type_name)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Submits a generated resource type to CloudFormation.")
+    parser.add_argument("type", help="the resource type to submit, eg. TF::Aviatrix::Account")
+    parser.add_argument("--force", action="store_true", help="submit the type even if its schema and handler package are unchanged")
+    parser.add_argument("--cache-dir", type=Path, default=default_cache_dir(), help="the root of the dependency cache (default: %(default)s)")
+    parser.add_argument("--no-dependency-cache", action="store_true", help="build the dependencies of the package from scratch")
+    args = parser.parse_args()
+
+    region = boto3.session.Session().region_name
+    if not region:
+        print("No default region found in AWS configuration.")
+        sys.exit(1)
+
+    resources_dir = Path("resources") / args.type.split("::")[1].lower()
+    resourcedir = resources_dir / args.type.replace("::","-")
+    manifest_path = resources_dir / MANIFEST_FILENAME
+    manifest = load_manifest(manifest_path)
+    cfn_client = boto3.client("cloudformation", region_name=region)
+
+    print("Preparing package...")
+    content_hash = package_hash(resourcedir)
+    if not args.force and is_unchanged(manifest, cfn_client, args.type, region, content_hash):
+        print("Skipping {}, the registered default version is unchanged".format(args.type))
+        return
+
+    print("Submitting...")
+    check_call(submit_command(region, None if args.no_dependency_cache else args.cache_dir), resourcedir.absolute())
+
+    record_submission(manifest, cfn_client, args.type, region, content_hash)
+    save_manifest(manifest_path, manifest)
+
+    print("Cleaning up...")
+    shutil.rmtree((resourcedir / "build").absolute())
 
-print("Submitting...")
-check_call(['cfn', 'submit', '--set-default'], resourcedir.absolute())
 
-print("Cleaning up...")
-shutil.rmtree((resourcedir / "build").absolute())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compares the project layout written by generate.scaffold_project with the golden tree in
+fixtures/scaffold/TF-Aviatrix-Account, which holds the files of
+
+    cfn init --type-name TF::Aviatrix::Account --artifact-type RESOURCE python37 --use-docker
+
+that the scaffolder writes, created with cloudformation-cli 0.2.41 and cloudformation-cli-python-plugin 2.1.5. The other
+files cfn init creates (the example schema, handlers.py, models.py, docs/, resource-role.yaml and rpdk.log) are
+replaced by the generator and `cfn generate`, and are left out. Regenerate the golden tree when upgrading the CLI or
+the plugin.
+
+Usage: python3 -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generate
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+GOLDEN_DIR = Path(__file__).resolve().parent / "fixtures" / "scaffold" / "TF-Aviatrix-Account"
+
+
+def read_tree(root):
+    return {f.relative_to(root).as_posix(): f.read_bytes() for f in sorted(root.rglob("*")) if f.is_file() and "__pycache__" not in f.parts}
+
+
+def test_scaffold_matches_cfn_init(tmp_path, monkeypatch):
+    # the scaffold templates are read relative to the repository, like generate.py does when run from it
+    monkeypatch.chdir(REPO_DIR)
+    providerdir = tmp_path / "TF-Aviatrix-Account"
+    providerdir.mkdir()
+
+    generate.scaffold_project(providerdir, "TF::Aviatrix::Account")
+
+    scaffolded = read_tree(providerdir)
+    golden = read_tree(GOLDEN_DIR)
+    assert sorted(scaffolded) == sorted(golden)
+    for filename, contents in golden.items():
+        assert scaffolded[filename].decode() == contents.decode(), filename
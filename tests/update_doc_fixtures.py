@@ -0,0 +1,92 @@
+"""
+Refreshes the documentation fixtures of test_process_resource_docs.py. The pages in FIXTURE_PAGES are copied verbatim
+from website/docs/r of the Aviatrix provider at PROVIDER_TAG, and their expected output is rewritten with the current
+parser. Review the diff of the expected output before committing it, it is what the parser is pinned to.
+
+Usage: python3 tests/update_doc_fixtures.py [--checkout <provider checkout at PROVIDER_TAG>]
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generate
+
+PROVIDER_SOURCE = "https://github.com/AviatrixSystems/terraform-provider-aviatrix.git"
+PROVIDER_TAG = "v3.1.0"
+FIXTURE_PAGES = ["firewall", "gateway_snat", "vpn_user"]
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "docs"
+
+
+def checkout_provider_docs(checkout_dir):
+    """
+    Makes a shallow, sparse checkout of the resource documentation of the provider at PROVIDER_TAG. Unlike the
+    checkout of generate.py, it doesn't fall back to the default branch when the tag is missing.
+
+    Args:
+        checkout_dir (Path): The directory to check out into, which must not exist.
+    """
+    generate.exec_call(['git', 'clone', '--depth', '1', '--filter=blob:none', '--sparse', '--branch', PROVIDER_TAG, PROVIDER_SOURCE, checkout_dir.name], checkout_dir.parent)
+    generate.exec_call(['git', 'sparse-checkout', 'set', 'website/docs/r'], checkout_dir)
+
+
+def checkout_tags(checkout_dir):
+    try:
+        return generate.exec_call(['git', 'tag', '--points-at', 'HEAD'], checkout_dir).decode().split()
+    except Exception:
+        return []
+
+
+def expected_output(page):
+    """
+    Parses a documentation page into its expected output, without the lookup indexes keyed by tuples, which can't be
+    stored as JSON and are checked against the arguments and attributes by the test.
+
+    Args:
+        page (Path): The documentation page.
+
+    Returns:
+        dict: The parsed documentation.
+    """
+    with open(page, "r") as f:
+        docs = generate.process_resource_docs("aviatrix", f, [], {})
+    docs.pop('argument_descriptions')
+    docs.pop('attribute_descriptions')
+    return docs
+
+
+def update_fixtures(checkout_dir):
+    for name in FIXTURE_PAGES:
+        page = FIXTURES_DIR / "r" / (name + ".html.markdown")
+        shutil.copyfile(checkout_dir / "website" / "docs" / "r" / (name + ".html.markdown"), page)
+        with open(FIXTURES_DIR / "expected" / (name + ".json"), "w") as f:
+            f.write(json.dumps(expected_output(page), indent=4) + "\n")
+        print("Updated {}".format(name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refreshes the documentation fixtures from the provider documentation at {}.".format(PROVIDER_TAG))
+    parser.add_argument("--checkout", type=Path, help="an existing provider checkout at {} (default: clone it)".format(PROVIDER_TAG))
+    args = parser.parse_args()
+
+    if args.checkout:
+        if PROVIDER_TAG not in checkout_tags(args.checkout):
+            print("{} is not checked out at {}".format(args.checkout, PROVIDER_TAG))
+            sys.exit(1)
+        update_fixtures(args.checkout)
+        return
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        checkout_dir = Path(tempdir) / "terraform-provider-aviatrix"
+        print("Checking out the provider documentation at {}...".format(PROVIDER_TAG))
+        checkout_provider_docs(checkout_dir)
+        update_fixtures(checkout_dir)
+
+
+if __name__ == "__main__":
+    main()